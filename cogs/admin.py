@@ -100,8 +100,8 @@ class Admin(commands.Cog):
     async def botinfo(self, interaction: discord.Interaction):
         """Display bot information"""
         # Calculate uptime
-        uptime = discord.utils.utcnow() - self.bot.start_time if hasattr(self.bot, 'start_time') else None
-        uptime_str = str(uptime).split('.')[0] if uptime else "Unknown"
+        uptime = discord.utils.utcnow() - self.bot.start_time
+        uptime_str = str(uptime).split('.')[0]
 
         # Get stats
         total_guilds = len(self.bot.guilds)
@@ -131,11 +131,7 @@ class Admin(commands.Cog):
     @is_admin()
     async def set_log_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
         """Set log channel"""
-        guild_config = await self.db.get_guild(interaction.guild.id)
-        if not guild_config:
-            guild_config = await self.db.create_guild(interaction.guild.id)
-
-        await self.db.update_guild(interaction.guild.id, {'log_channel': channel.id})
+        await self.db.upsert_guild(interaction.guild.id, {'log_channel': channel.id})
 
         embed = EmbedFactory.success(
             "Log Channel Set",
@@ -28,6 +28,10 @@ class AIChat(commands.Cog):
         self.provider = self.module_config.get('provider', 'openai')
         self.model = self.module_config.get('model', 'gpt-4')
         self.conversation_history: Dict[int, List[Dict]] = {}
+        # Read once; on_message checks it for every guild message
+        self.toxicity_filter_enabled = (
+            config.get('modules', {}).get('moderation', {}).get('auto_mod', {}).get('toxicity_filter', False)
+        )
 
     async def call_openai(self, messages: List[Dict], max_tokens: int = 500) -> Optional[str]:
         """Call OpenAI API"""
@@ -227,8 +231,7 @@ class AIChat(commands.Cog):
             return
 
         # Check if auto-moderation is enabled
-        module_config = self.config.get('modules', {}).get('moderation', {})
-        if not module_config.get('auto_mod', {}).get('toxicity_filter', False):
+        if not self.toxicity_filter_enabled:
             return
 
         # Moderate content
@@ -9,6 +9,7 @@ from discord.ext import commands
 from datetime import datetime, timedelta
 from typing import Optional
 import logging
+import time
 
 from utils.embeds import EmbedFactory, EmbedColor
 from utils.permissions import is_admin
@@ -78,47 +79,25 @@ class Analytics(commands.Cog):
         await interaction.response.defer()
 
         # Calculate time range
-        end_time = datetime.utcnow().timestamp()
-        start_time = (datetime.utcnow() - timedelta(days=days)).timestamp()
+        end_time = time.time()
+        start_time = end_time - timedelta(days=days).total_seconds()
 
-        # Get analytics data
-        messages = await self.db.get_analytics(
-            interaction.guild.id,
-            event_type='message',
-            start_time=start_time,
-            end_time=end_time
-        )
-
-        joins = await self.db.get_analytics(
-            interaction.guild.id,
-            event_type='member_join',
-            start_time=start_time,
-            end_time=end_time
-        )
-
-        leaves = await self.db.get_analytics(
-            interaction.guild.id,
-            event_type='member_leave',
-            start_time=start_time,
-            end_time=end_time
+        # Get analytics data (aggregated server-side)
+        counts = await self.db.analytics_counts(interaction.guild.id, start_time, end_time)
+        top_users = await self.db.analytics_top_users(
+            interaction.guild.id, 'message', start_time, end_time, limit=5
         )
 
         # Calculate stats
-        total_messages = len(messages)
-        total_joins = len(joins)
-        total_leaves = len(leaves)
+        total_messages = counts.get('message', 0)
+        total_joins = counts.get('member_join', 0)
+        total_leaves = counts.get('member_leave', 0)
         net_growth = total_joins - total_leaves
 
         # Most active users
-        user_message_counts = {}
-        for msg in messages:
-            user_id = msg.get('user_id')
-            user_message_counts[user_id] = user_message_counts.get(user_id, 0) + 1
-
-        top_users = sorted(user_message_counts.items(), key=lambda x: x[1], reverse=True)[:5]
         top_users_text = "\n".join([
-            f"{i + 1}. <@{user_id}>: {count} messages"
-            for i, (user_id, count) in enumerate(top_users)
+            f"{i + 1}. <@{entry['_id']}>: {entry['n']} messages"
+            for i, entry in enumerate(top_users)
         ]) if top_users else "No data"
 
         embed = EmbedFactory.create(
@@ -143,8 +122,8 @@ class Analytics(commands.Cog):
     async def activity(self, interaction: discord.Interaction):
         """View recent activity"""
         # Get last 24 hours of activity
-        end_time = datetime.utcnow().timestamp()
-        start_time = (datetime.utcnow() - timedelta(hours=24)).timestamp()
+        end_time = time.time()
+        start_time = end_time - timedelta(hours=24).total_seconds()
 
         events = await self.db.get_analytics(
             interaction.guild.id,
@@ -6,9 +6,9 @@ Virtual currency system with shop and gambling
 import discord
 from discord import app_commands
 from discord.ext import commands
-from datetime import datetime, timedelta
 from typing import Optional
 import logging
+import time
 import random
 
 from utils.embeds import EmbedFactory, EmbedColor
@@ -17,6 +17,10 @@ from database.db_manager import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Accepted /coinflip-bet answers
+HEADS_CHOICES = frozenset({'heads', 'h'})
+COINFLIP_CHOICES = HEADS_CHOICES | {'tails', 't'}
+
 
 class Economy(commands.Cog):
     """Economy system cog"""
@@ -35,12 +39,10 @@ class Economy(commands.Cog):
     @is_admin()
     async def daily(self, interaction: discord.Interaction):
         """Claim daily reward"""
-        user_data = await self.db.get_user(interaction.user.id, interaction.guild.id)
-        if not user_data:
-            user_data = await self.db.create_user(interaction.user.id, interaction.guild.id)
+        user_data = await self.db.get_or_create_user(interaction.user.id, interaction.guild.id)
 
         last_daily = user_data.get('last_daily', 0)
-        current_time = datetime.utcnow().timestamp()
+        current_time = time.time()
         cooldown = self.module_config.get('daily_cooldown', 86400)
 
         if current_time - last_daily < cooldown:
@@ -101,9 +103,7 @@ class Economy(commands.Cog):
             return
 
         # Check if sender has enough balance
-        sender_data = await self.db.get_user(interaction.user.id, interaction.guild.id)
-        if not sender_data:
-            sender_data = await self.db.create_user(interaction.user.id, interaction.guild.id)
+        sender_data = await self.db.get_or_create_user(interaction.user.id, interaction.guild.id)
 
         if sender_data.get('balance', 0) < amount:
             await interaction.response.send_message(
@@ -139,7 +139,7 @@ class Economy(commands.Cog):
             return
 
         choice = choice.lower()
-        if choice not in ['heads', 'tails', 'h', 't']:
+        if choice not in COINFLIP_CHOICES:
             await interaction.response.send_message(
                 embed=EmbedFactory.error("Invalid Choice", "Choose 'heads' or 'tails'"),
                 ephemeral=True
@@ -147,12 +147,10 @@ class Economy(commands.Cog):
             return
 
         # Normalize choice
-        choice = 'heads' if choice in ['heads', 'h'] else 'tails'
+        choice = 'heads' if choice in HEADS_CHOICES else 'tails'
 
         # Check balance
-        user_data = await self.db.get_user(interaction.user.id, interaction.guild.id)
-        if not user_data:
-            user_data = await self.db.create_user(interaction.user.id, interaction.guild.id)
+        user_data = await self.db.get_or_create_user(interaction.user.id, interaction.guild.id)
 
         if user_data.get('balance', 0) < amount:
             await interaction.response.send_message(
@@ -313,16 +313,12 @@ class Games(commands.Cog):
         """View rank card - PUBLIC"""
         target = user or interaction.user
 
-        user_data = await self.db.get_user(target.id, interaction.guild.id)
-        if not user_data:
-            user_data = await self.db.create_user(target.id, interaction.guild.id)
-
-        leaderboard = await self.db.get_leaderboard(interaction.guild.id, limit=1000)
-        rank = next((i + 1 for i, u in enumerate(leaderboard) if u['user_id'] == target.id), 0)
+        user_data = await self.db.get_or_create_user(target.id, interaction.guild.id)
 
         from utils.constants import calculate_level_xp
         level = user_data.get('level', 0)
         xp = user_data.get('xp', 0)
+        rank = await self.db.get_user_rank(interaction.guild.id, xp)
         next_level_xp = calculate_level_xp(level + 1)
 
         embed = EmbedFactory.rank_card(target, level, xp, rank, next_level_xp)
@@ -334,9 +330,7 @@ class Games(commands.Cog):
         """Check balance - PUBLIC"""
         target = user or interaction.user
 
-        user_data = await self.db.get_user(target.id, interaction.guild.id)
-        if not user_data:
-            user_data = await self.db.create_user(target.id, interaction.guild.id)
+        user_data = await self.db.get_or_create_user(target.id, interaction.guild.id)
 
         balance = user_data.get('balance', 0)
         embed = EmbedFactory.economy_balance(target, balance, "💎")
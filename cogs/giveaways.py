@@ -9,8 +9,10 @@ from discord.ext import commands
 from datetime import datetime, timedelta
 from typing import Optional
 import logging
+import time
 import random
 import asyncio
+from bson import ObjectId
 
 from utils.embeds import EmbedFactory, EmbedColor
 from utils.permissions import is_admin
@@ -19,11 +21,14 @@ from database.db_manager import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Shared default for giveaways without a participants field, instead of a new list per read
+_EMPTY: tuple = ()
+
 
 class GiveawayView(discord.ui.View):
     """View for giveaway participation"""
 
-    def __init__(self, giveaway_id: str, cog: 'Giveaways'):
+    def __init__(self, giveaway_id: ObjectId, cog: 'Giveaways'):
         super().__init__(timeout=None)
         self.giveaway_id = giveaway_id
         self.cog = cog
@@ -50,7 +55,7 @@ class GiveawayView(discord.ui.View):
             return
 
         # Check if user already entered
-        participants = giveaway.get('participants', [])
+        participants = giveaway.get('participants', _EMPTY)
         if interaction.user.id in participants:
             await interaction.response.send_message(
                 embed=EmbedFactory.warning("Already Entered", "You have already entered this giveaway!"),
@@ -91,7 +96,7 @@ class Giveaways(commands.Cog):
         await self.bot.wait_until_ready()
         while not self.bot.is_closed():
             try:
-                current_time = datetime.utcnow().timestamp()
+                current_time = time.time()
                 
                 # Find giveaways that should end
                 cursor = self.db.db.giveaways.find({
@@ -120,7 +125,7 @@ class Giveaways(commands.Cog):
             if not channel:
                 return
 
-            participants = giveaway.get('participants', [])
+            participants = giveaway.get('participants', _EMPTY)
             winners_count = giveaway.get('winners', 1)
             
             # Pick winners
@@ -205,7 +210,7 @@ class Giveaways(commands.Cog):
             )
             return
 
-        end_time = datetime.utcnow().timestamp() + seconds
+        end_time = time.time() + seconds
         end_timestamp = int(end_time)
 
         # Create giveaway in database
@@ -221,7 +226,7 @@ class Giveaways(commands.Cog):
         }
 
         result = await self.db.db.giveaways.insert_one(giveaway_data)
-        giveaway_id = str(result.inserted_id)
+        giveaway_id = result.inserted_id
 
         # Create giveaway embed
         embed = EmbedFactory.create(
@@ -305,7 +310,7 @@ class Giveaways(commands.Cog):
             )
             return
 
-        participants = giveaway.get('participants', [])
+        participants = giveaway.get('participants', _EMPTY)
         winners_count = giveaway.get('winners', 1)
 
         if len(participants) == 0:
@@ -6,9 +6,10 @@ XP and leveling system with rank cards
 import discord
 from discord import app_commands
 from discord.ext import commands
-from datetime import datetime
 from typing import Optional
 import logging
+import time
+from collections import OrderedDict
 from io import BytesIO
 from PIL import Image, ImageDraw, ImageFont
 
@@ -19,6 +20,9 @@ from database.db_manager import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Most (guild, user) cooldown stamps kept in memory; the oldest are dropped first
+XP_COOLDOWN_MAX_ENTRIES = 10000
+
 
 class Leveling(commands.Cog):
     """Leveling system cog"""
@@ -28,7 +32,7 @@ class Leveling(commands.Cog):
         self.db = db
         self.config = config
         self.module_config = config.get('modules', {}).get('leveling', {})
-        self.xp_cooldown = {}
+        self.xp_cooldown: "OrderedDict[tuple, float]" = OrderedDict()  # (guild_id, user_id) -> last award
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -40,41 +44,42 @@ class Leveling(commands.Cog):
             return
 
         # Check cooldown
-        user_key = f"{message.guild.id}_{message.author.id}"
-        current_time = datetime.utcnow().timestamp()
+        user_key = (message.guild.id, message.author.id)
+        current_time = time.monotonic()
 
-        if user_key in self.xp_cooldown:
-            if current_time - self.xp_cooldown[user_key] < self.module_config.get('xp_cooldown', 60):
-                return
+        last_award = self.xp_cooldown.get(user_key)
+        if last_award is not None and current_time - last_award < self.module_config.get('xp_cooldown', 60):
+            return
 
+        # Kept ordered by award time, so the front is always the stalest entry
         self.xp_cooldown[user_key] = current_time
+        self.xp_cooldown.move_to_end(user_key)
+        if len(self.xp_cooldown) > XP_COOLDOWN_MAX_ENTRIES:
+            self.xp_cooldown.popitem(last=False)
 
         # Get or create user
-        user_data = await self.db.get_user(message.author.id, message.guild.id)
-        if not user_data:
-            user_data = await self.db.create_user(message.author.id, message.guild.id)
+        user_data = await self.db.get_or_create_user(message.author.id, message.guild.id)
 
-        # Calculate XP
+        # Calculate XP; the stored total may still trail increments queued for the next flush
         xp_gain = self.module_config.get('xp_per_message', 10)
-        new_xp = user_data.get('xp', 0) + xp_gain
+        pending_xp = self.db.pending_increment(message.author.id, message.guild.id, 'xp')
+        new_xp = user_data.get('xp', 0) + pending_xp + xp_gain
         current_level = user_data.get('level', 0)
 
+        # XP is added in the next batched write instead of a write per message
+        self.db.increment_user_field_batched(message.author.id, message.guild.id, 'xp', xp_gain)
+
         # Check for level up
         next_level_xp = calculate_level_xp(current_level + 1)
 
         if new_xp >= next_level_xp:
             new_level = current_level + 1
-            await self.db.update_user(message.author.id, message.guild.id, {
-                'xp': new_xp,
-                'level': new_level
-            })
+            await self.db.update_user(message.author.id, message.guild.id, {'level': new_level})
 
             # Send level up message
             embed = EmbedFactory.level_up(message.author, new_level, new_xp)
             await message.channel.send(embed=embed)
             logger.info(f"{message.author} leveled up to {new_level} in {message.guild}")
-        else:
-            await self.db.update_user(message.author.id, message.guild.id, {'xp': new_xp})
 
     # NOTE: /rank and /leaderboard commands have been moved to games.py as PUBLIC commands
 
@@ -104,6 +109,8 @@ class Leveling(commands.Cog):
             'level': level,
             'xp': xp
         })
+        # An admin override can reorder the top of the board, so don't wait out the TTL
+        self.db.invalidate_leaderboard(interaction.guild.id)
 
         embed = EmbedFactory.success(
             "Level Set",
@@ -10,6 +10,9 @@ from datetime import datetime, timedelta
 from typing import Optional
 import logging
 import asyncio
+import time
+import weakref
+from collections import OrderedDict, deque
 
 from utils.embeds import EmbedFactory, EmbedColor
 from utils.permissions import is_moderator, PermissionChecker
@@ -19,6 +22,18 @@ from database.models import Warning
 
 logger = logging.getLogger(__name__)
 
+# How long to remember that a user has DMs closed before trying again
+DM_BLOCKED_TTL = 600
+
+# Most users whose recent message times are tracked for spam; least recently active are dropped first
+SPAM_TRACKER_MAX_USERS = 10000
+
+# Mod log description labels
+_LBL_CHANNEL = "**Channel:** "
+_LBL_MOD = "**Moderator:** "
+_LBL_AMOUNT = "**Amount:** "
+_LBL_DELAY = "**Delay:** "
+
 
 class Moderation(commands.Cog):
     """Moderation system cog"""
@@ -28,8 +43,57 @@ class Moderation(commands.Cog):
         self.db = db
         self.config = config
         self.module_config = config.get('modules', {}).get('moderation', {})
-        self.spam_tracker = {}  # Track spam
-        self.toxicity_filter_enabled = self.module_config.get('auto_mod', {}).get('toxicity_filter', True)
+        self.spam_tracker: "OrderedDict[int, deque]" = OrderedDict()  # user_id -> recent message times, oldest first
+        self._dm_blocked: dict[int, float] = {}  # user_id -> monotonic expiry
+        self._warn_locks = weakref.WeakValueDictionary()  # (guild_id, user_id) -> asyncio.Lock
+        self._unsaved_warnings: dict[tuple, int] = {}  # (guild_id, user_id) -> issued, not yet written
+        self._background_tasks = set()
+        # Auto-mod settings, resolved once instead of on every message
+        auto_mod = self.module_config.get('auto_mod', {})
+        self.toxicity_filter_enabled = auto_mod.get('toxicity_filter', True)
+        self.spam_detection_enabled = auto_mod.get('spam_detection', True)
+        self.max_mentions = auto_mod.get('max_mentions', 5)
+
+        # Static error embeds, built once and reused on every denial
+        self._err_invalid_duration = EmbedFactory.error(
+            "Invalid Duration", "Duration must be valid and less than 28 days", timestamp=False
+        )
+        self._err_invalid_delete_days = EmbedFactory.error(
+            "Invalid Parameter", "delete_messages must be between 0-7", timestamp=False
+        )
+        self._err_invalid_amount = EmbedFactory.error(
+            "Invalid Amount", "Amount must be between 1 and 100", timestamp=False
+        )
+        self._err_invalid_slowmode = EmbedFactory.error(
+            "Invalid Duration", "Slowmode must be between 0 and 21600 seconds (6 hours)", timestamp=False
+        )
+        self._err_invalid_id = EmbedFactory.error(
+            "Invalid ID", "Please provide a valid user ID", timestamp=False
+        )
+        self._err_not_banned = EmbedFactory.error(
+            "Not Found", "This user is not banned", timestamp=False
+        )
+        self._err_no_timeout_perm = EmbedFactory.error(
+            "Error", "I don't have permission to timeout this user", timestamp=False
+        )
+        self._err_no_kick_perm = EmbedFactory.error(
+            "Error", "I don't have permission to kick this user", timestamp=False
+        )
+        self._err_no_ban_perm = EmbedFactory.error(
+            "Error", "I don't have permission to ban this user", timestamp=False
+        )
+        self._err_no_unban_perm = EmbedFactory.error(
+            "Error", "I don't have permission to unban users", timestamp=False
+        )
+        self._err_no_delete_perm = EmbedFactory.error(
+            "Error", "I don't have permission to delete messages", timestamp=False
+        )
+        self._err_no_channel_perm = EmbedFactory.error(
+            "Error", "I don't have permission to edit this channel", timestamp=False
+        )
+        self._err_no_nick_perm = EmbedFactory.error(
+            "Error", "I don't have permission to change this user's nickname", timestamp=False
+        )
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -41,12 +105,11 @@ class Moderation(commands.Cog):
             return
 
         # Check spam
-        if self.module_config.get('auto_mod', {}).get('spam_detection', True):
+        if self.spam_detection_enabled:
             await self._check_spam(message)
 
         # Check excessive mentions
-        max_mentions = self.module_config.get('auto_mod', {}).get('max_mentions', 5)
-        if len(message.mentions) > max_mentions:
+        if len(message.mentions) > self.max_mentions:
             await message.delete()
             await message.channel.send(
                 f"{message.author.mention} Please don't spam mentions!",
@@ -57,29 +120,32 @@ class Moderation(commands.Cog):
     async def _check_spam(self, message: discord.Message):
         """Check for spam messages"""
         user_id = message.author.id
-        current_time = datetime.utcnow().timestamp()
+        current_time = time.monotonic()
 
-        if user_id not in self.spam_tracker:
-            self.spam_tracker[user_id] = []
+        timestamps = self.spam_tracker.get(user_id)
+        if timestamps is None:
+            timestamps = self.spam_tracker[user_id] = deque()
+            if len(self.spam_tracker) > SPAM_TRACKER_MAX_USERS:
+                self.spam_tracker.popitem(last=False)
+        else:
+            self.spam_tracker.move_to_end(user_id)
 
         # Add message timestamp
-        self.spam_tracker[user_id].append(current_time)
+        timestamps.append(current_time)
 
-        # Remove old timestamps (older than 5 seconds)
-        self.spam_tracker[user_id] = [
-            ts for ts in self.spam_tracker[user_id]
-            if current_time - ts < 5
-        ]
+        # Drop old timestamps (older than 5 seconds) from the front, in place
+        while current_time - timestamps[0] >= 5:
+            timestamps.popleft()
 
         # Check if spam threshold exceeded
-        if len(self.spam_tracker[user_id]) > 5:
+        if len(timestamps) > 5:
             try:
                 await message.author.timeout(timedelta(minutes=5), reason="Spam detected")
                 await message.channel.send(
                     f"{message.author.mention} has been timed out for 5 minutes due to spam.",
                     delete_after=10
                 )
-                self.spam_tracker[user_id] = []
+                timestamps.clear()
                 logger.info(f"Auto-muted {message.author} for spam")
             except discord.Forbidden:
                 pass
@@ -99,11 +165,7 @@ class Moderation(commands.Cog):
         """Warn a user"""
         can_moderate, error = PermissionChecker.can_moderate(interaction.user, user)
         if not can_moderate:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Cannot Warn", error),
-                ephemeral=True
-            )
-            return
+            return await self._err(interaction, EmbedFactory.error("Cannot Warn", error))
 
         # Create warning
         warning = Warning(
@@ -111,34 +173,35 @@ class Moderation(commands.Cog):
             reason=reason
         )
 
-        # Get or create user
-        user_data = await self.db.get_user(user.id, interaction.guild.id)
-        if not user_data:
-            user_data = await self.db.create_user(user.id, interaction.guild.id)
-
-        # Add warning
-        await self.db.add_warning(user.id, interaction.guild.id, warning.to_dict())
-
-        # Get total warnings
-        warnings = await self.db.get_warnings(user.id, interaction.guild.id)
+        # Counted under the member's lock, together with warnings still being written,
+        # so back-to-back warns each report their own total
+        key = (interaction.guild.id, user.id)
+        async with self._warn_lock(key):
+            saved = await self.db.count_warnings(user.id, interaction.guild.id)
+            unsaved = self._unsaved_warnings.get(key, 0)
+            self._unsaved_warnings[key] = unsaved + 1
+        total_warnings = saved + unsaved + 1
+
+        # Persist in the background; scheduled before replying so the pending
+        # count above is always settled, even if the reply fails
+        task = asyncio.create_task(self._persist_warning(interaction.guild, user, warning))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
 
         embed = EmbedFactory.moderation_action("Warning", user, interaction.user, reason)
-        embed.add_field(name="Total Warnings", value=str(len(warnings)), inline=False)
-
+        embed.add_field(name="Total Warnings", value=str(total_warnings), inline=False)
         await interaction.response.send_message(embed=embed)
 
         # DM user
-        try:
-            dm_embed = EmbedFactory.warning(
-                "You have been warned",
-                f"**Server:** {interaction.guild.name}\n**Reason:** {reason}\n**Total Warnings:** {len(warnings)}"
-            )
-            await user.send(embed=dm_embed)
-        except discord.Forbidden:
-            pass
-
-        # Log
-        await self._log_action(interaction.guild, embed)
+        dm_embed = EmbedFactory.warning(
+            "You have been warned",
+            f"**Server:** {interaction.guild.name}\n**Reason:** {reason}\n**Total Warnings:** {total_warnings}"
+        )
+        # DM and mod log are independent round-trips, send them together
+        await asyncio.gather(
+            self._safe_dm(user, dm_embed),
+            self._log_action(interaction.guild, embed)
+        )
         logger.info(f"{interaction.user} warned {user} in {interaction.guild}")
 
     @app_commands.command(name="warnings", description="View user warnings")
@@ -189,45 +252,36 @@ class Moderation(commands.Cog):
         """Timeout a user"""
         can_moderate, error = PermissionChecker.can_moderate(interaction.user, user)
         if not can_moderate:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Cannot Timeout", error),
-                ephemeral=True
-            )
-            return
+            return await self._err(interaction, EmbedFactory.error("Cannot Timeout", error))
 
         seconds = TimeConverter.parse(duration)
         if not seconds or seconds > 2419200:  # Max 28 days
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Invalid Duration", "Duration must be valid and less than 28 days"),
-                ephemeral=True
-            )
-            return
+            return await self._err(interaction, self._err_invalid_duration)
+
+        # Single clock read; the same end time goes to Discord and the embeds
+        ends_at = discord.utils.utcnow() + timedelta(seconds=seconds)
+        duration_text = TimeConverter.format_seconds(seconds)
 
         try:
-            await user.timeout(timedelta(seconds=seconds), reason=reason)
+            await user.timeout(ends_at, reason=reason)
             embed = EmbedFactory.moderation_action("Timeout", user, interaction.user, reason)
-            embed.add_field(name="Duration", value=TimeConverter.format_seconds(seconds), inline=False)
+            embed.add_field(name="Duration", value=duration_text, inline=False)
             await interaction.response.send_message(embed=embed)
 
             # DM user
-            try:
-                dm_embed = EmbedFactory.warning(
-                    "You have been timed out",
-                    f"**Server:** {interaction.guild.name}\n**Duration:** {TimeConverter.format_seconds(seconds)}\n**Reason:** {reason}"
-                )
-                await user.send(embed=dm_embed)
-            except discord.Forbidden:
-                pass
-
-            # Log
-            await self._log_action(interaction.guild, embed)
+            dm_embed = EmbedFactory.warning(
+                "You have been timed out",
+                f"**Server:** {interaction.guild.name}\n**Duration:** {duration_text}\n**Reason:** {reason}"
+            )
+            # DM and mod log are independent round-trips, send them together
+            await asyncio.gather(
+                self._safe_dm(user, dm_embed),
+                self._log_action(interaction.guild, embed)
+            )
             logger.info(f"{interaction.user} timed out {user} for {duration} in {interaction.guild}")
 
         except discord.Forbidden:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Error", "I don't have permission to timeout this user"),
-                ephemeral=True
-            )
+            await self._err(interaction, self._err_no_timeout_perm)
 
     @app_commands.command(name="kick", description="Kick a user")
     @app_commands.describe(
@@ -244,22 +298,15 @@ class Moderation(commands.Cog):
         """Kick a user"""
         can_moderate, error = PermissionChecker.can_moderate(interaction.user, user)
         if not can_moderate:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Cannot Kick", error),
-                ephemeral=True
-            )
-            return
+            return await self._err(interaction, EmbedFactory.error("Cannot Kick", error))
 
         try:
             # DM user before kicking
-            try:
-                dm_embed = EmbedFactory.warning(
-                    "You have been kicked",
-                    f"**Server:** {interaction.guild.name}\n**Reason:** {reason}"
-                )
-                await user.send(embed=dm_embed)
-            except discord.Forbidden:
-                pass
+            dm_embed = EmbedFactory.warning(
+                "You have been kicked",
+                f"**Server:** {interaction.guild.name}\n**Reason:** {reason}"
+            )
+            await self._safe_dm(user, dm_embed)
 
             await user.kick(reason=reason)
             embed = EmbedFactory.moderation_action("Kick", user, interaction.user, reason)
@@ -270,10 +317,7 @@ class Moderation(commands.Cog):
             logger.info(f"{interaction.user} kicked {user} from {interaction.guild}")
 
         except discord.Forbidden:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Error", "I don't have permission to kick this user"),
-                ephemeral=True
-            )
+            await self._err(interaction, self._err_no_kick_perm)
 
     @app_commands.command(name="ban", description="Ban a user")
     @app_commands.describe(
@@ -292,29 +336,18 @@ class Moderation(commands.Cog):
         """Ban a user"""
         can_moderate, error = PermissionChecker.can_moderate(interaction.user, user)
         if not can_moderate:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Cannot Ban", error),
-                ephemeral=True
-            )
-            return
+            return await self._err(interaction, EmbedFactory.error("Cannot Ban", error))
 
         if delete_messages < 0 or delete_messages > 7:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Invalid Parameter", "delete_messages must be between 0-7"),
-                ephemeral=True
-            )
-            return
+            return await self._err(interaction, self._err_invalid_delete_days)
 
         try:
             # DM user before banning
-            try:
-                dm_embed = EmbedFactory.error(
-                    "You have been banned",
-                    f"**Server:** {interaction.guild.name}\n**Reason:** {reason}"
-                )
-                await user.send(embed=dm_embed)
-            except discord.Forbidden:
-                pass
+            dm_embed = EmbedFactory.error(
+                "You have been banned",
+                f"**Server:** {interaction.guild.name}\n**Reason:** {reason}"
+            )
+            await self._safe_dm(user, dm_embed)
 
             await user.ban(reason=reason, delete_message_days=delete_messages)
             embed = EmbedFactory.moderation_action("Ban", user, interaction.user, reason)
@@ -325,10 +358,7 @@ class Moderation(commands.Cog):
             logger.info(f"{interaction.user} banned {user} from {interaction.guild}")
 
         except discord.Forbidden:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Error", "I don't have permission to ban this user"),
-                ephemeral=True
-            )
+            await self._err(interaction, self._err_no_ban_perm)
 
     @app_commands.command(name="unban", description="Unban a user")
     @app_commands.describe(user_id="ID of user to unban")
@@ -355,20 +385,11 @@ class Moderation(commands.Cog):
             logger.info(f"{interaction.user} unbanned {user} in {interaction.guild}")
 
         except ValueError:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Invalid ID", "Please provide a valid user ID"),
-                ephemeral=True
-            )
+            await self._err(interaction, self._err_invalid_id)
         except discord.NotFound:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Not Found", "This user is not banned"),
-                ephemeral=True
-            )
+            await self._err(interaction, self._err_not_banned)
         except discord.Forbidden:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Error", "I don't have permission to unban users"),
-                ephemeral=True
-            )
+            await self._err(interaction, self._err_no_unban_perm)
 
     @app_commands.command(name="clear", description="Clear messages in channel")
     @app_commands.describe(
@@ -384,11 +405,7 @@ class Moderation(commands.Cog):
     ):
         """Clear messages from channel"""
         if amount < 1 or amount > 100:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Invalid Amount", "Amount must be between 1 and 100"),
-                ephemeral=True
-            )
-            return
+            return await self._err(interaction, self._err_invalid_amount)
 
         await interaction.response.defer(ephemeral=True)
 
@@ -410,19 +427,18 @@ class Moderation(commands.Cog):
             # Log action
             log_embed = EmbedFactory.create(
                 title="🗑️ Messages Cleared",
-                description=f"**Channel:** {interaction.channel.mention}\n"
-                           f"**Moderator:** {interaction.user.mention}\n"
-                           f"**Amount:** {len(deleted)} messages{target_text}",
+                description="\n".join((
+                    _LBL_CHANNEL + interaction.channel.mention,
+                    _LBL_MOD + interaction.user.mention,
+                    _LBL_AMOUNT + str(len(deleted)) + " messages" + target_text
+                )),
                 color=EmbedColor.WARNING
             )
             await self._log_action(interaction.guild, log_embed)
             logger.info(f"{interaction.user} cleared {len(deleted)} messages in {interaction.channel}")
 
         except discord.Forbidden:
-            await interaction.followup.send(
-                embed=EmbedFactory.error("Error", "I don't have permission to delete messages"),
-                ephemeral=True
-            )
+            await self._err(interaction, self._err_no_delete_perm)
 
     @app_commands.command(name="slowmode", description="Set slowmode for channel")
     @app_commands.describe(seconds="Slowmode delay in seconds (0 to disable)")
@@ -430,11 +446,7 @@ class Moderation(commands.Cog):
     async def slowmode(self, interaction: discord.Interaction, seconds: int):
         """Set slowmode for channel"""
         if seconds < 0 or seconds > 21600:  # Max 6 hours
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Invalid Duration", "Slowmode must be between 0 and 21600 seconds (6 hours)"),
-                ephemeral=True
-            )
-            return
+            return await self._err(interaction, self._err_invalid_slowmode)
 
         try:
             await interaction.channel.edit(slowmode_delay=seconds)
@@ -452,19 +464,18 @@ class Moderation(commands.Cog):
             # Log action
             log_embed = EmbedFactory.create(
                 title="⏱️ Slowmode Updated",
-                description=f"**Channel:** {interaction.channel.mention}\n"
-                           f"**Moderator:** {interaction.user.mention}\n"
-                           f"**Delay:** {seconds} seconds",
+                description="\n".join((
+                    _LBL_CHANNEL + interaction.channel.mention,
+                    _LBL_MOD + interaction.user.mention,
+                    _LBL_DELAY + str(seconds) + " seconds"
+                )),
                 color=EmbedColor.INFO
             )
             await self._log_action(interaction.guild, log_embed)
             logger.info(f"{interaction.user} set slowmode to {seconds}s in {interaction.channel}")
 
         except discord.Forbidden:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Error", "I don't have permission to edit this channel"),
-                ephemeral=True
-            )
+            await self._err(interaction, self._err_no_channel_perm)
 
     @app_commands.command(name="lock", description="Lock a channel")
     @app_commands.describe(channel="Channel to lock (optional, defaults to current)")
@@ -485,18 +496,17 @@ class Moderation(commands.Cog):
             # Log action
             log_embed = EmbedFactory.create(
                 title="🔒 Channel Locked",
-                description=f"**Channel:** {target_channel.mention}\n"
-                           f"**Moderator:** {interaction.user.mention}",
+                description="\n".join((
+                    _LBL_CHANNEL + target_channel.mention,
+                    _LBL_MOD + interaction.user.mention
+                )),
                 color=EmbedColor.WARNING
             )
             await self._log_action(interaction.guild, log_embed)
             logger.info(f"{interaction.user} locked {target_channel}")
 
         except discord.Forbidden:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Error", "I don't have permission to edit this channel"),
-                ephemeral=True
-            )
+            await self._err(interaction, self._err_no_channel_perm)
 
     @app_commands.command(name="unlock", description="Unlock a channel")
     @app_commands.describe(channel="Channel to unlock (optional, defaults to current)")
@@ -517,18 +527,17 @@ class Moderation(commands.Cog):
             # Log action
             log_embed = EmbedFactory.create(
                 title="🔓 Channel Unlocked",
-                description=f"**Channel:** {target_channel.mention}\n"
-                           f"**Moderator:** {interaction.user.mention}",
+                description="\n".join((
+                    _LBL_CHANNEL + target_channel.mention,
+                    _LBL_MOD + interaction.user.mention
+                )),
                 color=EmbedColor.SUCCESS
             )
             await self._log_action(interaction.guild, log_embed)
             logger.info(f"{interaction.user} unlocked {target_channel}")
 
         except discord.Forbidden:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Error", "I don't have permission to edit this channel"),
-                ephemeral=True
-            )
+            await self._err(interaction, self._err_no_channel_perm)
 
     @app_commands.command(name="nickname", description="Change a user's nickname")
     @app_commands.describe(
@@ -545,11 +554,7 @@ class Moderation(commands.Cog):
         """Change user nickname"""
         can_moderate, error = PermissionChecker.can_moderate(interaction.user, user)
         if not can_moderate:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Cannot Change Nickname", error),
-                ephemeral=True
-            )
-            return
+            return await self._err(interaction, EmbedFactory.error("Cannot Change Nickname", error))
 
         try:
             old_nick = user.display_name
@@ -570,10 +575,55 @@ class Moderation(commands.Cog):
             logger.info(f"{interaction.user} changed {user}'s nickname to {nickname}")
 
         except discord.Forbidden:
-            await interaction.response.send_message(
-                embed=EmbedFactory.error("Error", "I don't have permission to change this user's nickname"),
-                ephemeral=True
-            )
+            await self._err(interaction, self._err_no_nick_perm)
+
+    async def _err(self, interaction: discord.Interaction, embed: discord.Embed):
+        """Send an ephemeral error reply, tolerating expired interactions"""
+        try:
+            if interaction.response.is_done():
+                await interaction.followup.send(embed=embed, ephemeral=True)
+            else:
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+        except discord.NotFound:
+            pass
+
+    def _warn_lock(self, key: tuple) -> asyncio.Lock:
+        """Get the lock serializing warning counts and writes for a member"""
+        lock = self._warn_locks.get(key)
+        if lock is None:
+            lock = self._warn_locks[key] = asyncio.Lock()
+        return lock
+
+    async def _persist_warning(self, guild: discord.Guild, user: discord.Member, warning: Warning):
+        """Save a warning, serialized per member so writes land in order"""
+        key = (guild.id, user.id)
+        async with self._warn_lock(key):
+            try:
+                await self.db.add_warning(user.id, guild.id, warning.to_dict())
+            except Exception as e:
+                logger.error(f"Failed to save warning for {user} in {guild}: {e}", exc_info=True)
+                await self._log_action(guild, EmbedFactory.error(
+                    "Warning Not Saved",
+                    f"The warning for {user.mention} could not be recorded. Please issue it again."
+                ))
+            finally:
+                # Written or dropped, it is no longer pending either way
+                unsaved = self._unsaved_warnings.pop(key) - 1
+                if unsaved:
+                    self._unsaved_warnings[key] = unsaved
+
+    async def _safe_dm(self, user: discord.Member, embed: discord.Embed):
+        """DM a user, skipping users recently seen with DMs disabled"""
+        blocked_until = self._dm_blocked.get(user.id)
+        if blocked_until is not None:
+            if time.monotonic() < blocked_until:
+                return
+            del self._dm_blocked[user.id]
+
+        try:
+            await user.send(embed=embed)
+        except discord.Forbidden:
+            self._dm_blocked[user.id] = time.monotonic() + DM_BLOCKED_TTL
 
     async def _log_action(self, guild: discord.Guild, embed: discord.Embed):
         """Log moderation action to log channel"""
@@ -590,7 +640,7 @@ class Moderation(commands.Cog):
             try:
                 await log_channel.send(embed=embed)
             except discord.Forbidden:
-                logger.warning(f"Cannot send to log channel in {guild}")
+                logger.warning("Cannot send to log channel in %s", guild)
 
 
 async def setup(bot: commands.Bot):
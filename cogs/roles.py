@@ -15,6 +15,9 @@ from database.db_manager import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Answers read as "yes" for the exclusive option
+TRUTHY_ANSWERS = frozenset({'yes', 'y', 'true'})
+
 
 class RoleMenuSetupModal(discord.ui.Modal, title="Create Role Menu"):
     """Modal for creating role menus with custom settings"""
@@ -59,7 +62,7 @@ class RoleMenuSetupModal(discord.ui.Modal, title="Create Role Menu"):
         import re
         
         # Parse exclusive setting
-        is_exclusive = self.exclusive.value.lower() in ['yes', 'y', 'true']
+        is_exclusive = self.exclusive.value.lower() in TRUTHY_ANSWERS
 
         # Parse role mentions
         role_list = []
@@ -172,8 +175,8 @@ class ExclusiveRoleSelect(discord.ui.Select):
             user_has_role = False
             existing_role = None
             for role_id in self.role_ids:
-                role = interaction.guild.get_role(role_id)
-                if role and role in interaction.user.roles:
+                role = interaction.user.get_role(role_id)
+                if role:
                     user_has_role = True
                     existing_role = role
                     break
@@ -244,26 +247,26 @@ class MultiRoleSelect(discord.ui.Select):
             options=options,
             custom_id="multi_role_select"
         )
+        # Parsed once here rather than from the option strings on every selection
+        self.role_ids = tuple(r['role'].id for r in role_data[:25])
 
     async def callback(self, interaction: discord.Interaction):
         """Handle role selection"""
         try:
             selected_role_ids = {int(value) for value in self.values}
-            current_role_ids = {role.id for role in interaction.user.roles}
 
             roles_to_add = []
             roles_to_remove = []
 
-            available_role_ids = {int(option.value) for option in self.options}
-
-            for role_id in available_role_ids:
+            for role_id in self.role_ids:
                 role = interaction.guild.get_role(role_id)
                 if not role:
                     continue
 
-                if role_id in selected_role_ids and role_id not in current_role_ids:
+                has_role = interaction.user.get_role(role_id) is not None
+                if role_id in selected_role_ids and not has_role:
                     roles_to_add.append(role)
-                elif role_id not in selected_role_ids and role_id in current_role_ids:
+                elif role_id not in selected_role_ids and has_role:
                     roles_to_remove.append(role)
 
             if roles_to_add:
@@ -370,7 +373,7 @@ class Roles(commands.Cog):
     ):
         """Create role menu directly with slash command"""
         target_channel = channel or interaction.channel
-        is_exclusive = exclusive.lower() in ['yes', 'y', 'true']
+        is_exclusive = exclusive.lower() in TRUTHY_ANSWERS
         
         # Collect all roles
         roles = [role1]
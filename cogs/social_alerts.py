@@ -17,6 +17,9 @@ from database.db_manager import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Platforms that alerts can be configured for
+SUPPORTED_PLATFORMS = frozenset({'twitch', 'youtube', 'twitter'})
+
 
 class SocialAlerts(commands.Cog):
     """Social media alerts cog"""
@@ -72,15 +75,15 @@ class SocialAlerts(commands.Cog):
 
     async def check_twitch(self, alert: dict):
         """Check Twitch for live streams"""
-        logger.debug(f"Checking Twitch for {alert['username']}")
+        logger.debug("Checking Twitch for %s", alert['username'])
 
     async def check_youtube(self, alert: dict):
         """Check YouTube for new videos"""
-        logger.debug(f"Checking YouTube for {alert['channel_id']}")
+        logger.debug("Checking YouTube for %s", alert['channel_id'])
 
     async def check_twitter(self, alert: dict):
         """Check Twitter/X for new tweets"""
-        logger.debug(f"Checking Twitter for {alert['username']}")
+        logger.debug("Checking Twitter for %s", alert['username'])
 
     @app_commands.command(name="alert-add", description="Add social media alert (Admin)")
     @app_commands.describe(
@@ -98,7 +101,7 @@ class SocialAlerts(commands.Cog):
     ):
         """Add social media alert (ADMIN ONLY)"""
         platform = platform.lower()
-        if platform not in ['twitch', 'youtube', 'twitter']:
+        if platform not in SUPPORTED_PLATFORMS:
             await interaction.response.send_message(
                 embed=EmbedFactory.error("Invalid Platform", "Platform must be twitch, youtube, or twitter"),
                 ephemeral=True
@@ -161,7 +164,7 @@ class SocialAlerts(commands.Cog):
     ):
         """Remove social media alert (ADMIN ONLY)"""
         platform = platform.lower()
-        if platform not in ['twitch', 'youtube', 'twitter']:
+        if platform not in SUPPORTED_PLATFORMS:
             await interaction.response.send_message(
                 embed=EmbedFactory.error("Invalid Platform", "Platform must be twitch, youtube, or twitter"),
                 ephemeral=True
@@ -244,7 +247,7 @@ class SocialAlerts(commands.Cog):
     ):
         """Test a social media alert (ADMIN ONLY)"""
         platform = platform.lower()
-        if platform not in ['twitch', 'youtube', 'twitter']:
+        if platform not in SUPPORTED_PLATFORMS:
             await interaction.response.send_message(
                 embed=EmbedFactory.error("Invalid Platform", "Platform must be twitch, youtube, or twitter"),
                 ephemeral=True
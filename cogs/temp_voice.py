@@ -37,14 +37,17 @@ class TempVoice(commands.Cog):
         if not self.module_config.get('enabled', True):
             return
 
-        guild_config = await self.db.get_guild(member.guild.id)
-        if not guild_config:
+        # Mute, deafen and stream toggles keep the member in the same channel and
+        # can't create or empty a temp channel, so they never reach the database
+        if before.channel == after.channel:
             return
 
         # Check if user joined the creator channel
-        creator_channel_id = guild_config.get('temp_voice_creator')
-        if creator_channel_id and after.channel and after.channel.id == creator_channel_id:
-            await self.create_temp_channel(member, after.channel)
+        if after.channel:
+            guild_config = await self.db.get_guild(member.guild.id)
+            creator_channel_id = guild_config.get('temp_voice_creator') if guild_config else None
+            if creator_channel_id and after.channel.id == creator_channel_id:
+                await self.create_temp_channel(member, after.channel)
 
         # Check if a temp channel is now empty
         if before.channel and before.channel.id in self.temp_channels:
@@ -54,7 +57,7 @@ class TempVoice(commands.Cog):
                     self.temp_channels.discard(before.channel.id)
                     logger.info(f"Deleted empty temp channel: {before.channel.name}")
                 except discord.Forbidden:
-                    logger.warning(f"Cannot delete temp channel: {before.channel.name}")
+                    logger.warning("Cannot delete temp channel: %s", before.channel.name)
                 except Exception as e:
                     logger.error(f"Error deleting temp channel: {e}", exc_info=True)
 
@@ -94,7 +97,7 @@ class TempVoice(commands.Cog):
             logger.info(f"Created temp channel for {member}: {temp_channel.name}")
 
         except discord.Forbidden:
-            logger.warning(f"Cannot create temp channel for {member}")
+            logger.warning("Cannot create temp channel for %s", member)
         except Exception as e:
             logger.error(f"Error creating temp channel: {e}", exc_info=True)
 
@@ -119,11 +122,7 @@ class TempVoice(commands.Cog):
             )
 
             # Save to database
-            guild_config = await self.db.get_guild(interaction.guild.id)
-            if not guild_config:
-                guild_config = await self.db.create_guild(interaction.guild.id)
-
-            await self.db.update_guild(interaction.guild.id, {
+            await self.db.upsert_guild(interaction.guild.id, {
                 'temp_voice_creator': creator_channel.id,
                 'temp_voice_category': category.id
             })
@@ -186,11 +186,13 @@ class Tickets(commands.Cog):
         guild_config = await self.db.get_guild(interaction.guild.id)
         support_role_id = guild_config.get('support_role') if guild_config else None
 
+        # Cheapest test first: guild_permissions folds every role's permissions on each access
         is_ticket_owner = interaction.channel.name == f"ticket-{interaction.user.name}"
-        is_admin = interaction.user.guild_permissions.administrator
-        has_support_role = support_role_id and interaction.guild.get_role(support_role_id) in interaction.user.roles
-
-        if not (is_ticket_owner or is_admin or has_support_role):
+        if not (
+            is_ticket_owner
+            or interaction.user.guild_permissions.administrator
+            or (support_role_id and interaction.user.get_role(support_role_id) is not None)
+        ):
             await interaction.response.send_message(
                 embed=EmbedFactory.error("No Permission", "Only the ticket owner or staff can close this ticket"),
                 ephemeral=True
@@ -263,10 +265,6 @@ class Tickets(commands.Cog):
         support_role: Optional[discord.Role] = None
     ):
         """Setup ticket system (ADMIN ONLY)"""
-        guild_config = await self.db.get_guild(interaction.guild.id)
-        if not guild_config:
-            guild_config = await self.db.create_guild(interaction.guild.id)
-
         update_data = {
             'ticket_category': category.id,
             'ticket_log_channel': log_channel.id
@@ -274,7 +272,7 @@ class Tickets(commands.Cog):
         if support_role:
             update_data['support_role'] = support_role.id
 
-        await self.db.update_guild(interaction.guild.id, update_data)
+        await self.db.upsert_guild(interaction.guild.id, update_data)
 
         embed = EmbedFactory.success(
             "✅ Ticket System Setup",
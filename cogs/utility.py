@@ -6,9 +6,9 @@ General utility commands
 import discord
 from discord import app_commands
 from discord.ext import commands
-from datetime import datetime, timedelta
 from typing import Optional
 import logging
+import time
 import asyncio
 
 from utils.embeds import EmbedFactory, EmbedColor
@@ -102,24 +102,28 @@ class Utility(commands.Cog):
         await self.bot.wait_until_ready()
         while not self.bot.is_closed():
             try:
-                current_time = datetime.utcnow().timestamp()
+                current_time = time.time()
                 due_reminders = await self.db.get_due_reminders(current_time)
 
+                completed = []
                 for reminder in due_reminders:
                     try:
                         channel = self.bot.get_channel(reminder['channel_id'])
                         if channel:
-                            user = await self.bot.fetch_user(reminder['user_id'])
+                            # A raw mention needs no user lookup
                             embed = EmbedFactory.info(
                                 "⏰ Reminder",
-                                f"{user.mention} {reminder['message']}"
+                                f"<@{reminder['user_id']}> {reminder['message']}"
                             )
                             await channel.send(embed=embed)
 
-                        await self.db.complete_reminder(str(reminder['_id']))
+                        completed.append(reminder['_id'])
                     except Exception as e:
                         logger.error(f"Error sending reminder: {e}", exc_info=True)
 
+                if completed:
+                    await self.db.complete_reminders(completed)
+
                 await asyncio.sleep(60)  # Check every minute
             except Exception as e:
                 logger.error(f"Error in reminder checker: {e}", exc_info=True)
@@ -195,7 +199,7 @@ class Utility(commands.Cog):
             )
             return
 
-        remind_at = datetime.utcnow().timestamp() + seconds
+        remind_at = time.time() + seconds
 
         reminder_data = {
             "user_id": interaction.user.id,
@@ -241,7 +245,7 @@ class Utility(commands.Cog):
                 {"name": "💬 Text Channels", "value": str(text_channels), "inline": True},
                 {"name": "🔊 Voice Channels", "value": str(voice_channels), "inline": True},
                 {"name": "🎭 Roles", "value": str(roles), "inline": True},
-                {"name": "👑 Owner", "value": guild.owner.mention if guild.owner else "Unknown", "inline": True},
+                {"name": "👑 Owner", "value": f"<@{guild.owner_id}>" if guild.owner_id else "Unknown", "inline": True},
                 {"name": "📅 Created", "value": guild.created_at.strftime("%Y-%m-%d"), "inline": True},
                 {"name": "🚀 Boost Level", "value": f"Level {guild.premium_tier}", "inline": True}
             ]
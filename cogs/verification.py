@@ -17,6 +17,10 @@ from database.db_manager import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Accepted /setup-verification options
+VERIFICATION_METHODS = frozenset({'dm', 'channel'})
+VERIFICATION_TYPES = frozenset({'button', 'captcha'})
+
 
 class VerificationSetupModal(discord.ui.Modal, title="Verification Setup"):
     """Modal for setting up verification with welcome message"""
@@ -40,10 +44,6 @@ class VerificationSetupModal(discord.ui.Modal, title="Verification Setup"):
 
     async def on_submit(self, interaction: discord.Interaction):
         """Handle modal submission"""
-        guild_config = await self.cog.db.get_guild(interaction.guild.id)
-        if not guild_config:
-            guild_config = await self.cog.db.create_guild(interaction.guild.id)
-
         update_data = {
             'verified_role': self.role.id,
             'welcome_channel': self.welcome_channel.id,
@@ -55,7 +55,7 @@ class VerificationSetupModal(discord.ui.Modal, title="Verification Setup"):
         if self.method == 'channel' and self.verify_channel:
             update_data['verify_channel'] = self.verify_channel.id
 
-        await self.cog.db.update_guild(interaction.guild.id, update_data)
+        await self.cog.db.upsert_guild(interaction.guild.id, update_data)
 
         if self.method == 'channel':
             method_text = f"**Verification Channel:** {self.verify_channel.mention}"
@@ -279,7 +279,7 @@ class Verification(commands.Cog):
             logger.info(f"Sent DM verification to {member} in {member.guild}")
 
         except discord.Forbidden:
-            logger.warning(f"Could not DM {member} in {member.guild} - DMs disabled")
+            logger.warning("Could not DM %s in %s - DMs disabled", member, member.guild)
             log_channel_id = guild_config.get('log_channel')
             if log_channel_id:
                 log_channel = member.guild.get_channel(log_channel_id)
@@ -373,7 +373,7 @@ class Verification(commands.Cog):
         """Setup verification system (ADMIN ONLY)"""
         method = method.lower()
         
-        if method not in ['dm', 'channel']:
+        if method not in VERIFICATION_METHODS:
             await interaction.response.send_message(
                 embed=EmbedFactory.error("Invalid Method", "Method must be 'dm' or 'channel'"),
                 ephemeral=True
@@ -387,7 +387,7 @@ class Verification(commands.Cog):
             )
             return
         
-        if verification_type not in ['button', 'captcha']:
+        if verification_type not in VERIFICATION_TYPES:
             await interaction.response.send_message(
                 embed=EmbedFactory.error("Invalid Type", "Verification type must be 'button' or 'captcha'"),
                 ephemeral=True
@@ -403,11 +403,7 @@ class Verification(commands.Cog):
     @is_admin()
     async def set_welcome_message(self, interaction: discord.Interaction, message: str):
         """Set custom welcome message for verification DMs (ADMIN ONLY)"""
-        guild_config = await self.db.get_guild(interaction.guild.id)
-        if not guild_config:
-            guild_config = await self.db.create_guild(interaction.guild.id)
-
-        await self.db.update_guild(interaction.guild.id, {
+        await self.db.upsert_guild(interaction.guild.id, {
             'welcome_message': message
         })
 
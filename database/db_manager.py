@@ -4,17 +4,65 @@ Handles async MongoDB operations with connection pooling
 """
 
 import asyncio
-from typing import Optional, Dict, Any, List
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
+from pymongo import ReadPreference, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Seconds a guild leaderboard is served from memory before it is re-read
+LEADERBOARD_TTL = 60
+
+# Cached in place of a document that does not exist, so repeat misses skip the query
+_ABSENT = object()
+
+# Index created in _ensure_indexes for get_leaderboard
+LEADERBOARD_INDEX = [("guild_id", 1), ("xp", -1)]
+
+# The only user fields leaderboard consumers read
+LEADERBOARD_PROJECTION = {"_id": 0, "user_id": 1, "xp": 1, "level": 1}
+
+# Marker document in the migrations collection, written once the arrays are moved
+EMBEDDED_ARRAYS_MIGRATION = "embedded_arrays"
+
+# Server error code for a unique index violation
+DUPLICATE_KEY = 11000
+
+# Seconds between flushes of batched user field increments
+INCREMENT_FLUSH_INTERVAL = 1.0
+
+# Analytics events are written once this many are buffered, or every interval
+EVENT_BATCH_SIZE = 200
+EVENT_FLUSH_INTERVAL = 2.0
+# Most events held while writes fail; the oldest are dropped past this
+EVENT_BUFFER_MAX = 10 * EVENT_BATCH_SIZE
+
+
+@lru_cache(maxsize=1024)
+def _oid(value: str) -> ObjectId:
+    """Parse a hex document ID, memoized for repeatedly accessed tickets/reminders"""
+    return ObjectId(value)
+
 
 class DatabaseManager:
     """Async MongoDB database manager with connection pooling"""
 
-    def __init__(self, uri: str, database_name: str, pool_size: int = 10):
+    def __init__(
+        self,
+        uri: str,
+        database_name: str,
+        pool_size: int = 100,
+        cache_ttl: float = 30.0,
+        cache_size: int = 10000,
+        index_hints: bool = False,
+        guild_cache_ttl: float = 3600.0
+    ):
         """
         Initialize database manager
 
@@ -22,13 +70,47 @@ class DatabaseManager:
             uri: MongoDB connection URI
             database_name: Name of the database
             pool_size: Maximum connection pool size
+            cache_ttl: Seconds a cached user document stays valid (0 disables)
+            cache_size: Maximum number of cached documents
+            index_hints: Pin hot queries to their intended index with hint()
+            guild_cache_ttl: Seconds a cached guild configuration stays valid (0 disables)
         """
         self.uri = uri
         self.database_name = database_name
         self.pool_size = pool_size
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.index_hints = index_hints
+        # Guild configs change only through this manager, which invalidates on write
+        self.guild_cache_ttl = guild_cache_ttl
         self.client: Optional[AsyncIOMotorClient] = None
         self.db: Optional[AsyncIOMotorDatabase] = None
+        # Hot collection handles, bound once in connect()
+        self._users: Optional[AsyncIOMotorCollection] = None
+        self._guilds: Optional[AsyncIOMotorCollection] = None
+        # Read-only handles that may be served by secondaries
+        self._analytics_ro: Optional[AsyncIOMotorCollection] = None
+        self._shop_ro: Optional[AsyncIOMotorCollection] = None
         self._connected = False
+        # LRU of hot read documents: key -> (monotonic expiry, document)
+        self._cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # guild_id -> (monotonic fetch time, limit fetched, entries sorted by xp desc)
+        self._lb_cache: Dict[int, Tuple[float, int, List[Dict[str, Any]]]] = {}
+        # guild_id -> in-flight get_guild query shared by concurrent misses
+        self._guild_loads: Dict[int, asyncio.Task] = {}
+        # guild_id -> invalidation count; a load only caches if it is unchanged
+        self._guild_generations: Dict[int, int] = {}
+        # (user_id, guild_id) -> {field: pending amount}
+        self._pending_increments: Dict[Tuple[int, int], Dict[str, int]] = {}
+        # Batch currently being written, still counted by pending_increment
+        self._inflight_increments: Dict[Tuple[int, int], Dict[str, int]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Latest increment bulk write, shielded from cancellation of its caller
+        self._increment_write: Optional[asyncio.Task] = None
+        self._event_buffer: List[Dict[str, Any]] = []
+        self._event_flush_task: Optional[asyncio.Task] = None
+        # Size-triggered event flushes running in the background
+        self._pending_event_flushes: set[asyncio.Task] = set()
 
     async def connect(self) -> None:
         """Establish database connection"""
@@ -36,21 +118,104 @@ class DatabaseManager:
             self.client = AsyncIOMotorClient(
                 self.uri,
                 maxPoolSize=self.pool_size,
-                minPoolSize=1,
-                serverSelectionTimeoutMS=5000
+                minPoolSize=min(self.pool_size, max(10, self.pool_size // 10)),
+                maxIdleTimeMS=300_000,
+                waitQueueTimeoutMS=10_000,
+                serverSelectionTimeoutMS=5000,
+                retryWrites=True,
+                compressors="zstd,snappy,zlib",
+                zlibCompressionLevel=6
             )
             self.db = self.client[self.database_name]
+            self._users = self.db.users
+            self._guilds = self.db.guilds
+            secondary = ReadPreference.SECONDARY_PREFERRED
+            self._analytics_ro = self.db.analytics.with_options(read_preference=secondary)
+            self._shop_ro = self.db.shop.with_options(read_preference=secondary)
             # Test connection
             await self.client.admin.command('ping')
             self._connected = True
             logger.info(f"Connected to MongoDB database: {self.database_name}")
+            await self._ensure_indexes()
+            self._event_flush_task = asyncio.create_task(self._event_flush_loop())
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
             raise
 
+        await self._run_migrations()
+
+    async def _ensure_indexes(self) -> None:
+        """Create indexes for the queries the cogs run, concurrently"""
+        results = await asyncio.gather(
+            self.db.users.create_index(LEADERBOARD_INDEX),  # first: checked below
+            self.db.users.create_index([("guild_id", 1), ("user_id", 1)], unique=True),
+            self.db.guilds.create_index([("guild_id", 1)], unique=True),
+            self.db.analytics.create_index([("guild_id", 1), ("type", 1), ("timestamp", -1)]),
+            self.db.analytics.create_index([("guild_id", 1), ("timestamp", -1)]),  # untyped get_analytics
+            # Only open reminders are ever polled, so index just those
+            self.db.reminders.create_index(
+                [("remind_at", 1)],
+                partialFilterExpression={"completed": False}
+            ),
+            self.db.shop.create_index([("guild_id", 1)]),
+            self.db.user_items.create_index([("guild_id", 1), ("user_id", 1), ("created_at", -1)]),
+            self.db.user_warnings.create_index([("guild_id", 1), ("user_id", 1), ("created_at", -1)]),
+            self.db.giveaways.create_index([("ended", 1), ("end_time", 1)]),
+            self.db.giveaways.create_index([("guild_id", 1), ("channel_id", 1), ("ended", 1)]),
+            self.db.social_alerts.create_index([("guild_id", 1), ("platform", 1), ("username", 1)]),
+            self.db.tickets.create_index([("channel_id", 1)]),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to create index: {result}")
+
+        # Hinting an index that doesn't exist fails the query outright
+        if self.index_hints and isinstance(results[0], Exception):
+            logger.warning("Leaderboard index unavailable, disabling index hints")
+            self.index_hints = False
+
+    async def _run_migrations(self) -> None:
+        """Run one-time data migrations that have not been recorded as done
+
+        A failed migration is logged and left unmarked, so it is retried on
+        the next connect; it never fails the connection itself.
+        """
+        try:
+            if await self.db.migrations.find_one({"_id": EMBEDDED_ARRAYS_MIGRATION}) is not None:
+                return
+            await self.migrate_embedded_arrays()
+            await self.db.migrations.update_one(
+                {"_id": EMBEDDED_ARRAYS_MIGRATION},
+                {"$set": {"completed_at": time.time()}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Embedded array migration failed, will retry on next connect: {e}", exc_info=True)
+
     async def disconnect(self) -> None:
         """Close database connection"""
+        loops = [task for task in (self._flush_task, self._event_flush_task) if task]
+        for task in loops:
+            task.cancel()
+        await asyncio.gather(*loops, return_exceptions=True)
+        self._flush_task = self._event_flush_task = None
         if self.client:
+            # A write the flush loop started keeps running past its cancellation
+            if self._increment_write is not None:
+                await asyncio.gather(self._increment_write, return_exceptions=True)
+            # A failed final flush is logged; it must not keep the client open
+            try:
+                await self.flush_increments()
+            except Exception as e:
+                logger.error(f"Failed to flush batched increments on disconnect: {e}")
+            # Background batch writes first: a failed one puts its events back for the final flush
+            if self._pending_event_flushes:
+                await asyncio.gather(*self._pending_event_flushes, return_exceptions=True)
+            try:
+                await self.flush_events()
+            except Exception as e:
+                logger.error(f"Failed to flush analytics events on disconnect, dropped {len(self._event_buffer)}: {e}")
             self.client.close()
             self._connected = False
             logger.info("Disconnected from MongoDB")
@@ -60,85 +225,350 @@ class DatabaseManager:
         """Check if database is connected"""
         return self._connected
 
+    # Read cache
+    def _cache_get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Return a cached document, or None if missing or expired"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return entry[1]
+
+    def _cache_set(self, key: Tuple, doc: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Cache a document for ttl seconds (default cache_ttl), evicting the least recently used entries"""
+        if ttl is None:
+            ttl = self.cache_ttl
+        if ttl <= 0:
+            return
+        self._cache[key] = (time.monotonic() + ttl, doc)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _invalidate(self, key: Tuple) -> None:
+        """Drop a cached document after a write"""
+        self._cache.pop(key, None)
+
+    def invalidate_guild(self, guild_id: int) -> None:
+        """Forget the cached configuration for a guild, found or absent"""
+        self._invalidate(("guild", guild_id))
+        # Loads already running read the old document; stop them caching it
+        self._guild_generations[guild_id] = self._guild_generations.get(guild_id, 0) + 1
+        self._guild_loads.pop(guild_id, None)
+
+    def invalidate_leaderboard(self, guild_id: int) -> None:
+        """Drop a guild's cached leaderboard so the next read re-ranks"""
+        self._lb_cache.pop(guild_id, None)
+
     # User operations
-    async def get_user(self, user_id: int, guild_id: int) -> Optional[Dict[str, Any]]:
-        """Get user document"""
-        return await self.db.users.find_one({
-            "user_id": user_id,
-            "guild_id": guild_id
-        })
+    async def get_user(
+        self,
+        user_id: int,
+        guild_id: int,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Get user document, or only the projected fields (uncached)"""
+        if projection is not None:
+            return await self._users.find_one(
+                {"user_id": user_id, "guild_id": guild_id},
+                projection
+            )
+
+        key = ("user", user_id, guild_id)
+        doc = self._cache_get(key)
+        if doc is None:
+            doc = await self._users.find_one({
+                "user_id": user_id,
+                "guild_id": guild_id
+            })
+            if doc is not None:
+                self._cache_set(key, doc)
+        return doc
+
+    @staticmethod
+    def _user_defaults() -> Dict[str, Any]:
+        """Default fields for a new user document"""
+        return {
+            "xp": 0,
+            "level": 0,
+            "balance": 1000,
+            "created_at": time.time()
+        }
 
     async def create_user(self, user_id: int, guild_id: int, data: Dict[str, Any] = None) -> Dict[str, Any]:
         """Create new user document"""
         user_data = {
             "user_id": user_id,
             "guild_id": guild_id,
-            "xp": 0,
-            "level": 0,
-            "balance": 1000,
-            "inventory": [],
-            "warnings": [],
-            "created_at": asyncio.get_event_loop().time()
+            **self._user_defaults()
         }
         if data:
             user_data.update(data)
 
-        await self.db.users.insert_one(user_data)
+        await self._users.insert_one(user_data)
+        self._invalidate(("user", user_id, guild_id))
         return user_data
 
+    async def multi_get_user(self, pairs: List[Tuple[int, int]]) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        """Get several user documents in one round-trip, keyed by (user_id, guild_id)"""
+        found: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        missing = []
+        for user_id, guild_id in pairs:
+            doc = self._cache_get(("user", user_id, guild_id))
+            if doc is None:
+                missing.append({"user_id": user_id, "guild_id": guild_id})
+            else:
+                found[(user_id, guild_id)] = doc
+
+        if missing:
+            async for doc in self._users.find({"$or": missing}):
+                pair = (doc["user_id"], doc["guild_id"])
+                found[pair] = doc
+                self._cache_set(("user", *pair), doc)
+        return found
+
+    async def get_or_create_user(self, user_id: int, guild_id: int) -> Dict[str, Any]:
+        """Get user document, creating it with defaults in the same round-trip"""
+        key = ("user", user_id, guild_id)
+        doc = self._cache_get(key)
+        if doc is None:
+            doc = await self._users.find_one_and_update(
+                {"user_id": user_id, "guild_id": guild_id},
+                {"$setOnInsert": self._user_defaults()},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            self._cache_set(key, doc)
+        return doc
+
     async def update_user(self, user_id: int, guild_id: int, data: Dict[str, Any]) -> bool:
         """Update user document"""
-        result = await self.db.users.update_one(
+        result = await self._users.update_one(
             {"user_id": user_id, "guild_id": guild_id},
             {"$set": data}
         )
+        self._invalidate(("user", user_id, guild_id))
         return result.modified_count > 0
 
     async def increment_user_field(self, user_id: int, guild_id: int, field: str, amount: int = 1) -> bool:
         """Increment a numeric field in user document"""
-        result = await self.db.users.update_one(
+        result = await self._users.update_one(
             {"user_id": user_id, "guild_id": guild_id},
             {"$inc": {field: amount}}
         )
+        self._invalidate(("user", user_id, guild_id))
         return result.modified_count > 0
 
-    # Guild operations
-    async def get_guild(self, guild_id: int) -> Optional[Dict[str, Any]]:
-        """Get guild configuration"""
-        return await self.db.guilds.find_one({"guild_id": guild_id})
+    def increment_user_field_batched(self, user_id: int, guild_id: int, field: str, amount: int = 1) -> None:
+        """Queue an increment; pending increments are written together every INCREMENT_FLUSH_INTERVAL"""
+        fields = self._pending_increments.setdefault((user_id, guild_id), {})
+        fields[field] = fields.get(field, 0) + amount
+        # Only poll for increments once something has queued one
+        if self._flush_task is None and self._connected:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def pending_increment(self, user_id: int, guild_id: int, field: str) -> int:
+        """Amount of batched increments to a field not yet reflected in the stored document"""
+        key = (user_id, guild_id)
+        return (
+            self._pending_increments.get(key, {}).get(field, 0)
+            + self._inflight_increments.get(key, {}).get(field, 0)
+        )
 
-    async def create_guild(self, guild_id: int, data: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Create new guild configuration"""
-        guild_data = {
-            "guild_id": guild_id,
+    def _requeue_increments(self, batch: Dict[Tuple[int, int], Dict[str, int]]) -> None:
+        """Merge increments that were not written back into the pending queue"""
+        for key, fields in batch.items():
+            pending = self._pending_increments.setdefault(key, {})
+            for field, amount in fields.items():
+                pending[field] = pending.get(field, 0) + amount
+
+    async def flush_increments(self) -> None:
+        """Write all queued increments in one unordered bulk write"""
+        if not self._pending_increments:
+            return
+
+        batch, self._pending_increments = self._pending_increments, {}
+        self._inflight_increments = batch
+        # Shielded so cancelling the caller never abandons a half-sent batch
+        self._increment_write = asyncio.ensure_future(self._write_increments(batch))
+        await asyncio.shield(self._increment_write)
+
+    async def _write_increments(self, batch: Dict[Tuple[int, int], Dict[str, int]]) -> None:
+        """Bulk-write a batch of increments, re-queueing any that were not applied"""
+        keys = list(batch)
+        ops = []
+        for user_id, guild_id in keys:
+            fields = batch[(user_id, guild_id)]
+            defaults = {k: v for k, v in self._user_defaults().items() if k not in fields}
+            ops.append(UpdateOne(
+                {"user_id": user_id, "guild_id": guild_id},
+                {"$inc": fields, "$setOnInsert": defaults},
+                upsert=True
+            ))
+
+        try:
+            await self._users.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            # Unordered: everything but the reported operations was applied
+            failed = {error["index"] for error in e.details.get("writeErrors", ())}
+            self._requeue_increments({keys[i]: batch[keys[i]] for i in failed})
+            raise
+        except Exception:
+            self._requeue_increments(batch)
+            raise
+        finally:
+            # Written increments are now in the stored documents, failed ones back in the queue
+            if self._inflight_increments is batch:
+                self._inflight_increments = {}
+            for user_id, guild_id in keys:
+                self._invalidate(("user", user_id, guild_id))
+
+    async def _flush_loop(self) -> None:
+        """Periodically flush batched increments"""
+        while True:
+            await asyncio.sleep(INCREMENT_FLUSH_INTERVAL)
+            try:
+                await self.flush_increments()
+            except Exception as e:
+                logger.error(f"Failed to flush batched increments: {e}")
+
+    # Guild operations
+    async def get_guild(
+        self,
+        guild_id: int,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Get guild configuration, or only the projected fields (uncached)"""
+        if projection is not None:
+            return await self._guilds.find_one({"guild_id": guild_id}, projection)
+
+        doc = self._cache_get(("guild", guild_id))
+        if doc is _ABSENT:
+            return None
+        if doc is not None:
+            return doc
+
+        # Concurrent misses for one guild (a join wave, startup) share a single query
+        task = self._guild_loads.get(guild_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load_guild(guild_id))
+            self._guild_loads[guild_id] = task
+            task.add_done_callback(lambda done: self._forget_guild_load(guild_id, done))
+        # Shielded so one cancelled caller doesn't cancel the load for the others
+        return await asyncio.shield(task)
+
+    def _forget_guild_load(self, guild_id: int, task: asyncio.Task) -> None:
+        """Drop a finished load, unless invalidation already replaced it"""
+        if self._guild_loads.get(guild_id) is task:
+            del self._guild_loads[guild_id]
+
+    async def _load_guild(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        """Read a guild configuration from Mongo into the cache"""
+        generation = self._guild_generations.get(guild_id, 0)
+        doc = await self._guilds.find_one({"guild_id": guild_id})
+        # Unconfigured guilds are cached too; create_guild invalidates the entry
+        if self._guild_generations.get(guild_id, 0) == generation:
+            self._cache_set(("guild", guild_id), _ABSENT if doc is None else doc, self.guild_cache_ttl)
+        return doc
+
+    async def multi_get_guild(self, guild_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get several guild configurations in one round-trip, keyed by guild ID"""
+        found: Dict[int, Dict[str, Any]] = {}
+        missing = []
+        for guild_id in guild_ids:
+            doc = self._cache_get(("guild", guild_id))
+            if doc is None:
+                missing.append(guild_id)
+            elif doc is not _ABSENT:
+                found[guild_id] = doc
+
+        if missing:
+            generations = {guild_id: self._guild_generations.get(guild_id, 0) for guild_id in missing}
+            async for doc in self._guilds.find({"guild_id": {"$in": missing}}):
+                found[doc["guild_id"]] = doc
+            # Skip guilds invalidated while the query ran, as in _load_guild
+            for guild_id in missing:
+                if self._guild_generations.get(guild_id, 0) == generations[guild_id]:
+                    self._cache_set(("guild", guild_id), found.get(guild_id, _ABSENT), self.guild_cache_ttl)
+        return found
+
+    @staticmethod
+    def _guild_defaults() -> Dict[str, Any]:
+        """Default fields for a new guild configuration"""
+        return {
             "prefix": "/",
             "modules": {},
             "log_channel": None,
             "welcome_channel": None,
             "verified_role": None,
-            "created_at": asyncio.get_event_loop().time()
+            "created_at": time.time()
+        }
+
+    async def create_guild(self, guild_id: int, data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Create new guild configuration"""
+        guild_data = {
+            "guild_id": guild_id,
+            **self._guild_defaults()
         }
         if data:
             guild_data.update(data)
 
-        await self.db.guilds.insert_one(guild_data)
+        await self._guilds.insert_one(guild_data)
+        self.invalidate_guild(guild_id)
         return guild_data
 
     async def update_guild(self, guild_id: int, data: Dict[str, Any]) -> bool:
         """Update guild configuration"""
-        result = await self.db.guilds.update_one(
+        result = await self._guilds.update_one(
             {"guild_id": guild_id},
             {"$set": data}
         )
+        self.invalidate_guild(guild_id)
         return result.modified_count > 0
 
+    async def upsert_guild(self, guild_id: int, data: Dict[str, Any]) -> None:
+        """Set guild configuration fields, creating the guild with defaults if needed"""
+        defaults = {k: v for k, v in self._guild_defaults().items() if k not in data}
+        await self._guilds.update_one(
+            {"guild_id": guild_id},
+            {"$set": data, "$setOnInsert": defaults},
+            upsert=True
+        )
+        self.invalidate_guild(guild_id)
+
     # Leveling operations
     async def get_leaderboard(self, guild_id: int, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get XP leaderboard for guild"""
-        cursor = self.db.users.find(
-            {"guild_id": guild_id}
-        ).sort("xp", -1).limit(limit)
-        return await cursor.to_list(length=limit)
+        """Get XP leaderboard for guild, refreshed at most every LEADERBOARD_TTL seconds"""
+        now = time.monotonic()
+        cached = self._lb_cache.get(guild_id)
+        if cached is not None:
+            fetched_at, fetched_limit, entries = cached
+            # A short list means the guild has fewer users than were asked for
+            if now - fetched_at < LEADERBOARD_TTL and (fetched_limit >= limit or len(entries) < fetched_limit):
+                return entries[:limit]
+
+        # Read from the primary: a lagging secondary would re-cache a board that
+        # invalidate_leaderboard just dropped, for the whole LEADERBOARD_TTL
+        cursor = self._users.find({"guild_id": guild_id}, LEADERBOARD_PROJECTION)
+        if self.index_hints:
+            cursor = cursor.hint(LEADERBOARD_INDEX)
+        cursor = cursor.sort("xp", -1).limit(limit)
+        entries = await cursor.to_list(length=limit)
+        self._lb_cache[guild_id] = (now, limit, entries)
+        return entries
+
+    async def get_user_rank(self, guild_id: int, xp: int) -> int:
+        """Get the 1-based leaderboard position for an XP total
+
+        Counts users in the guild with strictly more XP, so tied users share
+        a rank. The count is answered from the (guild_id, xp) index instead
+        of pulling the leaderboard into memory.
+        """
+        ahead = await self._users.count_documents({"guild_id": guild_id, "xp": {"$gt": xp}})
+        return ahead + 1
 
     # Economy operations
     async def add_balance(self, user_id: int, guild_id: int, amount: int) -> bool:
@@ -146,33 +576,104 @@ class DatabaseManager:
         return await self.increment_user_field(user_id, guild_id, "balance", amount)
 
     async def remove_balance(self, user_id: int, guild_id: int, amount: int) -> bool:
-        """Remove from user balance"""
-        user = await self.get_user(user_id, guild_id)
-        if user and user.get("balance", 0) >= amount:
-            return await self.increment_user_field(user_id, guild_id, "balance", -amount)
-        return False
+        """Remove from user balance, only if the user can cover the amount"""
+        result = await self._users.find_one_and_update(
+            {"user_id": user_id, "guild_id": guild_id, "balance": {"$gte": amount}},
+            {"$inc": {"balance": -amount}},
+            projection={"_id": 1}
+        )
+        self._invalidate(("user", user_id, guild_id))
+        return result is not None
 
     async def add_item(self, user_id: int, guild_id: int, item: Dict[str, Any]) -> bool:
         """Add item to user inventory"""
-        result = await self.db.users.update_one(
+        await self.db.user_items.insert_one({
+            **item,
+            "user_id": user_id,
+            "guild_id": guild_id,
+            "created_at": time.time()
+        })
+        return True
+
+    async def get_inventory(self, user_id: int, guild_id: int) -> List[Dict[str, Any]]:
+        """Get user inventory, oldest first"""
+        cursor = self.db.user_items.find(
             {"user_id": user_id, "guild_id": guild_id},
-            {"$push": {"inventory": item}}
-        )
-        return result.modified_count > 0
+            {"_id": 0, "user_id": 0, "guild_id": 0}
+        ).sort("created_at", 1)
+        return await cursor.to_list(length=None)
 
     # Moderation operations
     async def add_warning(self, user_id: int, guild_id: int, warning: Dict[str, Any]) -> bool:
         """Add warning to user"""
-        result = await self.db.users.update_one(
-            {"user_id": user_id, "guild_id": guild_id},
-            {"$push": {"warnings": warning}}
-        )
-        return result.modified_count > 0
+        await self.db.user_warnings.insert_one({
+            **warning,
+            "user_id": user_id,
+            "guild_id": guild_id,
+            "created_at": time.time()
+        })
+        return True
 
     async def get_warnings(self, user_id: int, guild_id: int) -> List[Dict[str, Any]]:
-        """Get user warnings"""
-        user = await self.get_user(user_id, guild_id)
-        return user.get("warnings", []) if user else []
+        """Get user warnings, oldest first"""
+        cursor = self.db.user_warnings.find(
+            {"user_id": user_id, "guild_id": guild_id},
+            {"_id": 0, "user_id": 0, "guild_id": 0}
+        ).sort("created_at", 1)
+        return await cursor.to_list(length=None)
+
+    async def count_warnings(self, user_id: int, guild_id: int) -> int:
+        """Count user warnings"""
+        return await self.db.user_warnings.count_documents({"user_id": user_id, "guild_id": guild_id})
+
+    async def migrate_embedded_arrays(self) -> int:
+        """
+        One-time migration of inventory/warnings arrays off user documents
+
+        Run from connect() until its marker document exists. Rows are
+        inserted under deterministic IDs before the arrays are unset, so a
+        failure at any point leaves the arrays in place and a rerun (or a
+        concurrent instance) skips rows that were already copied.
+
+        Returns:
+            Number of user documents migrated
+        """
+        migrated = 0
+        cursor = self._users.find(
+            {"$or": [{"inventory.0": {"$exists": True}}, {"warnings.0": {"$exists": True}}]},
+            {"user_id": 1, "guild_id": 1, "inventory": 1, "warnings": 1, "created_at": 1}
+        )
+        async for user in cursor:
+            owner = {"user_id": user["user_id"], "guild_id": user["guild_id"]}
+            created_at = user.get("created_at", 0)
+            items = [
+                {**item, **owner, "_id": f"{user['_id']}:{i}", "created_at": created_at}
+                for i, item in enumerate(user.get("inventory", []))
+            ]
+            warnings = [
+                {**warning, **owner, "_id": f"{user['_id']}:{i}", "created_at": warning.get("timestamp", created_at)}
+                for i, warning in enumerate(user.get("warnings", []))
+            ]
+            if items:
+                await self._insert_migrated(self.db.user_items, items)
+            if warnings:
+                await self._insert_migrated(self.db.user_warnings, warnings)
+            # Only drop the arrays once every row is known to be stored
+            await self._users.update_one({"_id": user["_id"]}, {"$unset": {"inventory": "", "warnings": ""}})
+            self._invalidate(("user", user["user_id"], user["guild_id"]))
+            migrated += 1
+
+        logger.info(f"Migrated embedded inventory/warnings for {migrated} users")
+        return migrated
+
+    @staticmethod
+    async def _insert_migrated(collection: AsyncIOMotorCollection, rows: List[Dict[str, Any]]) -> None:
+        """Insert migrated rows, treating rows already copied by an earlier run as done"""
+        try:
+            await collection.insert_many(rows, ordered=False)
+        except BulkWriteError as e:
+            if any(error.get("code") != DUPLICATE_KEY for error in e.details.get("writeErrors", ())):
+                raise
 
     # Tickets operations
     async def create_ticket(self, ticket_data: Dict[str, Any]) -> str:
@@ -182,36 +683,91 @@ class DatabaseManager:
 
     async def get_ticket(self, ticket_id: str) -> Optional[Dict[str, Any]]:
         """Get ticket by ID"""
-        from bson import ObjectId
-        return await self.db.tickets.find_one({"_id": ObjectId(ticket_id)})
+        return await self.db.tickets.find_one({"_id": _oid(ticket_id)})
 
     async def update_ticket(self, ticket_id: str, data: Dict[str, Any]) -> bool:
         """Update ticket"""
-        from bson import ObjectId
         result = await self.db.tickets.update_one(
-            {"_id": ObjectId(ticket_id)},
+            {"_id": _oid(ticket_id)},
             {"$set": data}
         )
         return result.modified_count > 0
 
     # Analytics operations
     async def log_event(self, event_type: str, data: Dict[str, Any]) -> None:
-        """Log analytics event"""
-        event = {
+        """Buffer an analytics event; buffered events are written in batches"""
+        self._event_buffer.append({
             "type": event_type,
-            "timestamp": asyncio.get_event_loop().time(),
+            "timestamp": time.time(),
             **data
-        }
-        await self.db.analytics.insert_one(event)
+        })
+        if len(self._event_buffer) >= EVENT_BATCH_SIZE:
+            # Take the batch now, but write it in the background so the event
+            # that filled it isn't held up by the insert
+            batch, self._event_buffer = self._event_buffer, []
+            task = asyncio.ensure_future(self._write_events(batch))
+            self._pending_event_flushes.add(task)
+            task.add_done_callback(self._pending_event_flushes.discard)
+
+    async def flush_events(self) -> None:
+        """Write all buffered analytics events in one unordered insert"""
+        if not self._event_buffer:
+            return
+
+        batch, self._event_buffer = self._event_buffer, []
+        try:
+            await self.db.analytics.insert_many(batch, ordered=False)
+        except BaseException as e:
+            # Includes cancellation at shutdown; a retried event that did land is a duplicate _id
+            self._requeue_events(batch, e)
+            raise
+
+    async def _write_events(self, batch: List[Dict[str, Any]]) -> None:
+        """Insert a batch of analytics events, logging instead of raising on failure"""
+        try:
+            await self.db.analytics.insert_many(batch, ordered=False)
+        except Exception as e:
+            self._requeue_events(batch, e)
+            logger.error(f"Failed to flush analytics events: {e}")
+
+    def _requeue_events(self, batch: List[Dict[str, Any]], error: Exception) -> None:
+        """Put events a failed insert did not store back at the front of the buffer"""
+        if isinstance(error, BulkWriteError):
+            # Unordered: only the reported events failed, and a duplicate _id was stored by an earlier try
+            failed = [
+                batch[write_error["index"]]
+                for write_error in error.details.get("writeErrors", ())
+                if write_error.get("code") != DUPLICATE_KEY
+            ]
+        else:
+            failed = batch
+
+        buffer = failed + self._event_buffer
+        dropped = len(buffer) - EVENT_BUFFER_MAX
+        if dropped > 0:
+            logger.error(f"Analytics buffer full, dropped {dropped} oldest events")
+            buffer = buffer[dropped:]
+        self._event_buffer = buffer
+
+    async def _event_flush_loop(self) -> None:
+        """Periodically flush buffered analytics events"""
+        while True:
+            await asyncio.sleep(EVENT_FLUSH_INTERVAL)
+            try:
+                await self.flush_events()
+            except Exception as e:
+                logger.error(f"Failed to flush analytics events: {e}")
 
     async def get_analytics(
         self,
         guild_id: int,
         event_type: Optional[str] = None,
         start_time: Optional[float] = None,
-        end_time: Optional[float] = None
+        end_time: Optional[float] = None,
+        skip: int = 0,
+        limit: int = 1000
     ) -> List[Dict[str, Any]]:
-        """Get analytics events with filters"""
+        """Get a page of analytics events with filters, newest first"""
         query = {"guild_id": guild_id}
         if event_type:
             query["type"] = event_type
@@ -222,8 +778,37 @@ class DatabaseManager:
             if end_time:
                 query["timestamp"]["$lte"] = end_time
 
-        cursor = self.db.analytics.find(query).sort("timestamp", -1)
-        return await cursor.to_list(length=1000)
+        cursor = self._analytics_ro.find(query).sort("timestamp", -1).skip(skip).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def analytics_counts(self, guild_id: int, start_time: float, end_time: float) -> Dict[str, int]:
+        """Count analytics events per type in a time range, server-side"""
+        cursor = self._analytics_ro.aggregate([
+            {"$match": {"guild_id": guild_id, "timestamp": {"$gte": start_time, "$lte": end_time}}},
+            {"$group": {"_id": "$type", "n": {"$sum": 1}}}
+        ])
+        return {doc["_id"]: doc["n"] async for doc in cursor}
+
+    async def analytics_top_users(
+        self,
+        guild_id: int,
+        event_type: str,
+        start_time: float,
+        end_time: float,
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Get the users with the most events of a type in a time range, server-side"""
+        cursor = self._analytics_ro.aggregate([
+            {"$match": {
+                "guild_id": guild_id,
+                "type": event_type,
+                "timestamp": {"$gte": start_time, "$lte": end_time}
+            }},
+            {"$group": {"_id": "$user_id", "n": {"$sum": 1}}},
+            {"$sort": {"n": -1}},
+            {"$limit": limit}
+        ])
+        return await cursor.to_list(length=limit)
 
     # Reminder operations
     async def create_reminder(self, reminder_data: Dict[str, Any]) -> str:
@@ -241,17 +826,24 @@ class DatabaseManager:
 
     async def complete_reminder(self, reminder_id: str) -> bool:
         """Mark reminder as completed"""
-        from bson import ObjectId
         result = await self.db.reminders.update_one(
-            {"_id": ObjectId(reminder_id)},
+            {"_id": _oid(reminder_id)},
             {"$set": {"completed": True}}
         )
         return result.modified_count > 0
 
+    async def complete_reminders(self, reminder_ids: List[ObjectId]) -> int:
+        """Mark several reminders as completed in one write"""
+        result = await self.db.reminders.update_many(
+            {"_id": {"$in": reminder_ids}},
+            {"$set": {"completed": True}}
+        )
+        return result.modified_count
+
     # Shop operations
     async def get_shop_items(self, guild_id: int) -> List[Dict[str, Any]]:
         """Get shop items for guild"""
-        cursor = self.db.shop.find({"guild_id": guild_id})
+        cursor = self._shop_ro.find({"guild_id": guild_id})
         return await cursor.to_list(length=100)
 
     async def create_shop_item(self, item_data: Dict[str, Any]) -> str:
@@ -3,12 +3,63 @@ Data models for Logiq
 Defines structure for database documents
 """
 
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, field
-from datetime import datetime
-
-
-@dataclass
+from typing import List, Optional, Dict, Any, Mapping
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+import time
+
+# Shared read-only default for payloads that are only read, never filled in place
+_EMPTY_MAPPING: Mapping[str, Any] = MappingProxyType({})
+
+
+def _empty_mapping() -> Mapping[str, Any]:
+    """Return the shared empty mapping instead of allocating a new dict"""
+    return _EMPTY_MAPPING
+
+
+def fast_dict(cls=None, *, omit_none: bool = False):
+    """Attach a to_dict generated from the dataclass fields
+
+    The method body is compiled once per class, so each call is a flat
+    sequence of attribute loads instead of a hand-maintained (or reflective)
+    field walk. With omit_none, fields that default to None are only written
+    when set, keeping unset optionals out of the stored document.
+    """
+    def wrap(cls):
+        names = [f.name for f in fields(cls)]
+        optional = {f.name for f in fields(cls) if omit_none and f.default is None}
+
+        # Fields up to the first optional go in the literal; the rest are
+        # assigned in declaration order so the document keeps the field order
+        leading = 0
+        while leading < len(names) and names[leading] not in optional:
+            leading += 1
+
+        lines = ["def to_dict(self):"]
+        lines.append("    d = {" + ", ".join(f"{name!r}: self.{name}" for name in names[:leading]) + "}")
+        for name in names[leading:]:
+            if name in optional:
+                lines.append(f"    if self.{name} is not None:")
+                lines.append(f"        d[{name!r}] = self.{name}")
+            else:
+                lines.append(f"    d[{name!r}] = self.{name}")
+        lines.append("    return d")
+
+        namespace: Dict[str, Any] = {}
+        exec("\n".join(lines), {}, namespace)
+
+        to_dict = namespace["to_dict"]
+        to_dict.__qualname__ = f"{cls.__qualname__}.to_dict"
+        to_dict.__doc__ = "Convert to dictionary"
+        to_dict.__annotations__ = {"return": Dict[str, Any]}
+        cls.to_dict = to_dict
+        return cls
+
+    return wrap if cls is None else wrap(cls)
+
+
+@fast_dict(omit_none=True)
+@dataclass(slots=True)
 class User:
     """User model"""
     user_id: int
@@ -16,29 +67,13 @@ class User:
     xp: int = 0
     level: int = 0
     balance: int = 1000
-    inventory: List[Dict[str, Any]] = field(default_factory=list)
-    warnings: List[Dict[str, Any]] = field(default_factory=list)
-    created_at: float = field(default_factory=lambda: datetime.now().timestamp())
+    created_at: float = field(default_factory=time.time)
     last_message: Optional[float] = None
     last_daily: Optional[float] = None
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary"""
-        return {
-            "user_id": self.user_id,
-            "guild_id": self.guild_id,
-            "xp": self.xp,
-            "level": self.level,
-            "balance": self.balance,
-            "inventory": self.inventory,
-            "warnings": self.warnings,
-            "created_at": self.created_at,
-            "last_message": self.last_message,
-            "last_daily": self.last_daily
-        }
-
-
-@dataclass
+
+@fast_dict
+@dataclass(slots=True)
 class Guild:
     """Guild configuration model"""
     guild_id: int
@@ -47,38 +82,20 @@ class Guild:
     welcome_channel: Optional[int] = None
     verified_role: Optional[int] = None
     modules: Dict[str, bool] = field(default_factory=dict)
-    created_at: float = field(default_factory=lambda: datetime.now().timestamp())
+    created_at: float = field(default_factory=time.time)
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary"""
-        return {
-            "guild_id": self.guild_id,
-            "prefix": self.prefix,
-            "log_channel": self.log_channel,
-            "welcome_channel": self.welcome_channel,
-            "verified_role": self.verified_role,
-            "modules": self.modules,
-            "created_at": self.created_at
-        }
-
-
-@dataclass
+
+@fast_dict
+@dataclass(slots=True)
 class Warning:
     """Warning model"""
     moderator_id: int
     reason: str
-    timestamp: float = field(default_factory=lambda: datetime.now().timestamp())
-
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary"""
-        return {
-            "moderator_id": self.moderator_id,
-            "reason": self.reason,
-            "timestamp": self.timestamp
-        }
+    timestamp: float = field(default_factory=time.time)
 
 
-@dataclass
+@fast_dict(omit_none=True)
+@dataclass(slots=True)
 class Ticket:
     """Support ticket model"""
     ticket_id: str
@@ -87,26 +104,13 @@ class Ticket:
     channel_id: int
     category: str
     status: str = "open"  # open, closed, resolved
-    created_at: float = field(default_factory=lambda: datetime.now().timestamp())
+    created_at: float = field(default_factory=time.time)
     closed_at: Optional[float] = None
     messages: List[Dict[str, Any]] = field(default_factory=list)
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary"""
-        return {
-            "ticket_id": self.ticket_id,
-            "guild_id": self.guild_id,
-            "user_id": self.user_id,
-            "channel_id": self.channel_id,
-            "category": self.category,
-            "status": self.status,
-            "created_at": self.created_at,
-            "closed_at": self.closed_at,
-            "messages": self.messages
-        }
-
-
-@dataclass
+
+@fast_dict(omit_none=True)
+@dataclass(slots=True)
 class ShopItem:
     """Shop item model"""
     item_id: str
@@ -118,21 +122,9 @@ class ShopItem:
     stock: int = -1  # -1 = unlimited
     purchasable: bool = True
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary"""
-        return {
-            "item_id": self.item_id,
-            "guild_id": self.guild_id,
-            "name": self.name,
-            "description": self.description,
-            "price": self.price,
-            "role_id": self.role_id,
-            "stock": self.stock,
-            "purchasable": self.purchasable
-        }
-
-
-@dataclass
+
+@fast_dict
+@dataclass(slots=True)
 class Reminder:
     """Reminder model"""
     reminder_id: str
@@ -142,35 +134,31 @@ class Reminder:
     message: str
     remind_at: float
     completed: bool = False
-    created_at: float = field(default_factory=lambda: datetime.now().timestamp())
+    created_at: float = field(default_factory=time.time)
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary"""
-        return {
-            "reminder_id": self.reminder_id,
-            "user_id": self.user_id,
-            "guild_id": self.guild_id,
-            "channel_id": self.channel_id,
-            "message": self.message,
-            "remind_at": self.remind_at,
-            "completed": self.completed,
-            "created_at": self.created_at
-        }
-
-
-@dataclass
+
+@dataclass(slots=True)
 class AnalyticsEvent:
     """Analytics event model"""
     event_type: str
     guild_id: int
-    timestamp: float = field(default_factory=lambda: datetime.now().timestamp())
-    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+    data: Mapping[str, Any] = field(default_factory=_empty_mapping)
+    _merged: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
 
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary"""
-        return {
-            "type": self.event_type,
-            "guild_id": self.guild_id,
-            "timestamp": self.timestamp,
-            **self.data
-        }
+        """Convert to dictionary
+
+        The merged document is built once per event; later calls return a
+        shallow copy of it, since insert_one adds an _id to the dict it is
+        given. Events are write-once, so fields are not expected to change
+        after the first call.
+        """
+        if self._merged is None:
+            self._merged = {
+                "type": self.event_type,
+                "guild_id": self.guild_id,
+                "timestamp": self.timestamp,
+                **self.data
+            }
+        return dict(self._merged)
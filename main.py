@@ -8,11 +8,17 @@ from discord.ext import commands
 import asyncio
 import logging
 import os
+import re
 import sys
-from pathlib import Path
+import time
 import yaml
 from dotenv import load_dotenv
 
+try:
+    from yaml import CSafeLoader as YamlLoader  # libyaml-backed, when PyYAML was built with it
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 from database.db_manager import DatabaseManager
 from utils.logger import BotLogger
 from utils.embeds import EmbedColor
@@ -20,27 +26,59 @@ from utils.embeds import EmbedColor
 # Load environment variables
 load_dotenv()
 
+# Seconds the summed member count is reused for logs and /stats
+MEMBER_COUNT_TTL = 300
+# Guild configurations fetched per query when warming the cache on startup
+GUILD_WARM_BATCH = 500
+
+# Matches a config value that is entirely a ${ENV_VAR} reference
+_ENV_RE = re.compile(r'^\$\{([^}]+)\}$')
+
+
+async def _missing_permissions(ctx, error):
+    """Reply to a prefix command the invoker lacks permissions for"""
+    await ctx.send("You don't have permission to use this command.")
+
+
+async def _missing_argument(ctx, error):
+    """Reply naming the missing prefix command argument"""
+    await ctx.send(f"Missing required argument: {error.param}")
+
+
+# Prefix-command errors answered directly; None means ignore silently
+_CMD_ERROR_HANDLERS = {
+    commands.CommandNotFound: None,
+    commands.MissingPermissions: _missing_permissions,
+    commands.MissingRequiredArgument: _missing_argument,
+}
+
 
 class Logiq(commands.Bot):
     """Custom bot class"""
 
     def __init__(self, config: dict):
         """Initialize bot"""
-        # Setup intents
+        # Setup intents. Presence updates are the highest-volume gateway events and
+        # no cog reads member status or activity, so they are opt-in.
+        bot_config = config['bot']
         intents = discord.Intents.default()
         intents.message_content = True
-        intents.members = True
-        intents.presences = True
+        intents.members = bot_config.get('need_members', True)  # member join/leave events, guild.members
+        intents.presences = bot_config.get('need_presences', False)
 
         # Initialize bot
         super().__init__(
-            command_prefix=config['bot']['prefix'],
+            command_prefix=bot_config['prefix'],
             intents=intents,
             help_command=None
         )
 
         self.config = config
         self.start_time = discord.utils.utcnow()
+        self._cog_files = None
+        self._member_count_cache = (0.0, 0)
+        self._warm_task = None
+        self._guild_cache_warmed = False
 
         # Setup logging
         self.logger = BotLogger(config.get('logging', {}))
@@ -49,9 +87,19 @@ class Logiq(commands.Bot):
         db_config = config.get('database', {})
         mongodb_uri = os.getenv('MONGODB_URI', db_config.get('mongodb_uri', 'mongodb://localhost:27017'))
         database_name = db_config.get('database_name', 'Logiq')
-        pool_size = db_config.get('pool_size', 10)
-
-        self.db = DatabaseManager(mongodb_uri, database_name, pool_size)
+        pool_size = db_config.get('pool_size', 100)
+        cache_ttl = db_config.get('cache_ttl', 30)
+        guild_cache_ttl = db_config.get('guild_cache_ttl', 3600)
+        index_hints = db_config.get('index_hints', False)
+
+        self.db = DatabaseManager(
+            mongodb_uri,
+            database_name,
+            pool_size,
+            cache_ttl=cache_ttl,
+            index_hints=index_hints,
+            guild_cache_ttl=guild_cache_ttl
+        )
 
     async def setup_hook(self):
         """Setup hook - called when bot is starting"""
@@ -68,10 +116,23 @@ class Logiq(commands.Bot):
         # Load cogs
         await self.load_cogs()
 
+    @property
+    def cog_files(self) -> list:
+        """Cog module names in the cogs directory, discovered once"""
+        if self._cog_files is None:
+            cogs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cogs')
+            with os.scandir(cogs_dir) as entries:
+                self._cog_files = sorted(
+                    entry.name[:-3] for entry in entries
+                    if entry.name.endswith('.py')
+                    and entry.name != '__init__.py'
+                    and entry.is_file()
+                )
+        return self._cog_files
+
     async def load_cogs(self):
         """Load all cogs from cogs directory"""
-        cogs_dir = Path(__file__).parent / 'cogs'
-        cog_files = [f.stem for f in cogs_dir.glob('*.py') if f.stem != '__init__']
+        cog_files = self.cog_files
 
         self.logger.info(f"Loading {len(cog_files)} cogs...")
 
@@ -84,11 +145,40 @@ class Logiq(commands.Bot):
 
         self.logger.info(f"Successfully loaded {len(self.cogs)} cogs")
 
+    def total_member_count(self) -> int:
+        """Approximate member count across all guilds, recomputed at most every MEMBER_COUNT_TTL seconds"""
+        computed_at, count = self._member_count_cache
+        now = time.monotonic()
+        if not computed_at or now - computed_at >= MEMBER_COUNT_TTL:
+            count = sum(g.member_count or g.approximate_member_count or 0 for g in self.guilds)
+            self._member_count_cache = (now, count)
+        return count
+
+    async def warm_guild_cache(self):
+        """Load joined guilds' configurations into the database cache, once per process
+
+        Capped at half the cache so warmed guilds don't evict each other (or
+        every user document); guilds past the cap load on their first event.
+        """
+        guild_ids = [guild.id for guild in self.guilds][:self.db.cache_size // 2]
+        try:
+            for start in range(0, len(guild_ids), GUILD_WARM_BATCH):
+                await self.db.multi_get_guild(guild_ids[start:start + GUILD_WARM_BATCH])
+            self._guild_cache_warmed = True
+            self.logger.info(f"Warmed config cache for {len(guild_ids)} guilds")
+        except Exception as e:
+            self.logger.error(f"Failed to warm guild cache: {e}", exc_info=True)
+
     async def on_ready(self):
         """Called when bot is ready"""
         self.logger.info(f"Logged in as {self.user} (ID: {self.user.id})")
         self.logger.info(f"Connected to {len(self.guilds)} guilds")
-        self.logger.info(f"Serving {sum(g.member_count for g in self.guilds)} users")
+        self.logger.info(f"Serving {self.total_member_count()} users")
+
+        # Pay the per-guild config lookups now rather than on each guild's first event;
+        # reconnects fire on_ready again, but the long guild TTL keeps the first warm-up
+        if not self._guild_cache_warmed and (self._warm_task is None or self._warm_task.done()):
+            self._warm_task = asyncio.create_task(self.warm_guild_cache())
 
         # Set status
         activity_type = self.config['bot'].get('activity_type', 'watching')
@@ -117,18 +207,22 @@ class Logiq(commands.Bot):
 
         self.logger.info("Bot is ready!")
 
+    async def on_guild_join(self, guild: discord.Guild):
+        """Seed the config cache for a newly joined guild"""
+        try:
+            await self.db.get_guild(guild.id)
+        except Exception as e:
+            self.logger.error(f"Failed to load config for {guild}: {e}", exc_info=True)
+
     async def on_command_error(self, ctx, error):
         """Global error handler"""
-        if isinstance(error, commands.CommandNotFound):
-            return
-
-        if isinstance(error, commands.MissingPermissions):
-            await ctx.send("You don't have permission to use this command.")
-            return
-
-        if isinstance(error, commands.MissingRequiredArgument):
-            await ctx.send(f"Missing required argument: {error.param}")
-            return
+        # The exact type hits on the first probe; the MRO walk keeps subclasses handled
+        for error_type in type(error).__mro__:
+            if error_type in _CMD_ERROR_HANDLERS:
+                handler = _CMD_ERROR_HANDLERS[error_type]
+                if handler is not None:
+                    await handler(ctx, error)
+                return
 
         self.logger.error(f"Command error: {error}", exc_info=True)
 
@@ -147,7 +241,7 @@ def load_config(config_path: str = 'config.yaml') -> dict:
     """Load configuration from YAML file"""
     try:
         with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=YamlLoader)
 
         # Replace environment variables
         def replace_env_vars(obj):
@@ -156,9 +250,10 @@ def load_config(config_path: str = 'config.yaml') -> dict:
                 return {k: replace_env_vars(v) for k, v in obj.items()}
             elif isinstance(obj, list):
                 return [replace_env_vars(item) for item in obj]
-            elif isinstance(obj, str) and obj.startswith('${') and obj.endswith('}'):
-                env_var = obj[2:-1]
-                return os.getenv(env_var, obj)
+            elif isinstance(obj, str):
+                match = _ENV_RE.match(obj)
+                if match:
+                    return os.environ.get(match.group(1), obj)
             return obj
 
         return replace_env_vars(config)
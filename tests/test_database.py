@@ -4,6 +4,7 @@ Unit tests for database manager
 
 import pytest
 import asyncio
+from motor.motor_asyncio import AsyncIOMotorCollection
 from database.db_manager import DatabaseManager
 from database.models import User, Guild
 
@@ -13,7 +14,11 @@ async def db_manager():
     """Create database manager for testing"""
     db = DatabaseManager("mongodb://localhost:27017", "Logiq_test", pool_size=5)
     await db.connect()
+    # Start every test from an empty database; the unique indexes reject reused IDs
+    await db.client.drop_database("Logiq_test")
+    await db._ensure_indexes()
     yield db
+    await db.client.drop_database("Logiq_test")
     await db.disconnect()
 
 
@@ -44,6 +49,21 @@ async def test_user_retrieval(db_manager):
     assert retrieved['user_id'] == user_id
 
 
+@pytest.mark.asyncio
+async def test_get_or_create_user(db_manager):
+    """Test upserting a user returns defaults once, then the stored document"""
+    user_id = 123456790
+    guild_id = 987654321
+
+    user = await db_manager.get_or_create_user(user_id, guild_id)
+    assert user['user_id'] == user_id
+    assert user['balance'] == 1000
+
+    await db_manager.add_balance(user_id, guild_id, 250)
+    user = await db_manager.get_or_create_user(user_id, guild_id)
+    assert user['balance'] == 1250
+
+
 @pytest.mark.asyncio
 async def test_balance_operations(db_manager):
     """Test balance add/remove"""
@@ -63,6 +83,24 @@ async def test_balance_operations(db_manager):
     assert user['balance'] == 1200
 
 
+@pytest.mark.asyncio
+async def test_batched_increments(db_manager):
+    """Test queued increments count as pending until one flush writes them"""
+    user_id = 123456793
+    guild_id = 987654321
+
+    db_manager.increment_user_field_batched(user_id, guild_id, "xp", 10)
+    db_manager.increment_user_field_batched(user_id, guild_id, "xp", 15)
+    assert db_manager.pending_increment(user_id, guild_id, "xp") == 25
+
+    await db_manager.flush_increments()
+    assert db_manager.pending_increment(user_id, guild_id, "xp") == 0
+
+    user = await db_manager.get_user(user_id, guild_id)
+    assert user['xp'] == 25
+    assert user['balance'] == 1000  # created with defaults by the upsert
+
+
 @pytest.mark.asyncio
 async def test_guild_creation(db_manager):
     """Test guild creation"""
@@ -73,6 +111,60 @@ async def test_guild_creation(db_manager):
     assert guild['prefix'] == "/"
 
 
+@pytest.mark.asyncio
+async def test_multi_get_guild(db_manager):
+    """Test fetching several guilds at once"""
+    await db_manager.create_guild(111)
+    await db_manager.create_guild(222)
+
+    guilds = await db_manager.multi_get_guild([111, 222, 333])
+    assert set(guilds) == {111, 222}
+    assert guilds[111]['guild_id'] == 111
+
+
+@pytest.mark.asyncio
+async def test_missing_guild_is_cached_until_created(db_manager):
+    """Test a missing guild reads as None until create_guild invalidates it"""
+    guild_id = 111222335
+
+    assert await db_manager.get_guild(guild_id) is None
+    assert await db_manager.get_guild(guild_id) is None
+    assert await db_manager.multi_get_guild([guild_id]) == {}
+
+    await db_manager.create_guild(guild_id)
+    guild = await db_manager.get_guild(guild_id)
+    assert guild is not None
+    assert guild['guild_id'] == guild_id
+
+
+@pytest.mark.asyncio
+async def test_guild_load_racing_invalidation_is_not_cached(db_manager):
+    """Test a load that started before an invalidation doesn't cache its stale read"""
+    guild_id = 111222337
+
+    load = asyncio.ensure_future(db_manager._load_guild(guild_id))
+    await asyncio.sleep(0)  # let the load issue its query
+    db_manager.invalidate_guild(guild_id)  # as a concurrent upsert_guild would
+
+    assert await load is None
+    assert db_manager._cache_get(("guild", guild_id)) is None
+
+
+@pytest.mark.asyncio
+async def test_upsert_guild(db_manager):
+    """Test upserting a guild creates it with defaults, then updates in place"""
+    guild_id = 111222336
+
+    await db_manager.upsert_guild(guild_id, {"log_channel": 42})
+    guild = await db_manager.get_guild(guild_id)
+    assert guild['log_channel'] == 42
+    assert guild['prefix'] == "/"
+
+    await db_manager.upsert_guild(guild_id, {"log_channel": 43})
+    guild = await db_manager.get_guild(guild_id)
+    assert guild['log_channel'] == 43
+
+
 @pytest.mark.asyncio
 async def test_leaderboard(db_manager):
     """Test leaderboard retrieval"""
@@ -86,6 +178,109 @@ async def test_leaderboard(db_manager):
     assert len(leaderboard) == 5
     assert leaderboard[0]['xp'] > leaderboard[-1]['xp']  # Should be sorted
 
+    # Cached until invalidated
+    await db_manager.update_user(100, guild_id, {"xp": 10000})
+    assert (await db_manager.get_leaderboard(guild_id, limit=5))[0]['user_id'] != 100
+    db_manager.invalidate_leaderboard(guild_id)
+    assert (await db_manager.get_leaderboard(guild_id, limit=5))[0]['user_id'] == 100
+
+
+@pytest.mark.asyncio
+async def test_user_rank(db_manager):
+    """Test rank is counted from users with more XP"""
+    guild_id = 987654322
+
+    for i in range(3):
+        await db_manager.create_user(200 + i, guild_id, {"xp": (i + 1) * 100})
+
+    assert await db_manager.get_user_rank(guild_id, 300) == 1
+    assert await db_manager.get_user_rank(guild_id, 100) == 3
+    assert await db_manager.get_user_rank(guild_id, 150) == 3
+
+
+@pytest.mark.asyncio
+async def test_migrate_embedded_arrays(db_manager):
+    """Test embedded warnings move to their collection exactly once"""
+    user_id = 123456791
+    guild_id = 987654321
+
+    await db_manager.create_user(user_id, guild_id, {
+        "warnings": [{"reason": "spam", "timestamp": 1.0}, {"reason": "caps", "timestamp": 2.0}]
+    })
+
+    assert await db_manager.migrate_embedded_arrays() == 1
+    assert await db_manager.migrate_embedded_arrays() == 0
+
+    warnings = await db_manager.get_warnings(user_id, guild_id)
+    assert [w['reason'] for w in warnings] == ["spam", "caps"]
+    assert await db_manager.count_warnings(user_id, guild_id) == 2
+    assert 'warnings' not in await db_manager.get_user(user_id, guild_id)
+
+
+@pytest.mark.asyncio
+async def test_failed_migration_keeps_embedded_arrays(db_manager, monkeypatch):
+    """Test a failed copy leaves the embedded arrays in place for a rerun"""
+    user_id = 123456792
+    guild_id = 987654321
+
+    await db_manager.create_user(user_id, guild_id, {"warnings": [{"reason": "spam", "timestamp": 1.0}]})
+
+    async def failing_insert_many(self, *args, **kwargs):
+        raise ConnectionError("connection dropped")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(AsyncIOMotorCollection, "insert_many", failing_insert_many)
+        with pytest.raises(ConnectionError):
+            await db_manager.migrate_embedded_arrays()
+
+    user = await db_manager.get_user(user_id, guild_id)
+    assert [w['reason'] for w in user['warnings']] == ["spam"]
+
+    assert await db_manager.migrate_embedded_arrays() == 1
+    assert await db_manager.count_warnings(user_id, guild_id) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_event_flush_keeps_events(db_manager, monkeypatch):
+    """Test events from a failed flush are buffered again and written by the next one"""
+    guild_id = 987654323
+
+    await db_manager.log_event("message", {"guild_id": guild_id, "user_id": 1})
+    await db_manager.log_event("message", {"guild_id": guild_id, "user_id": 2})
+
+    async def failing_insert_many(self, *args, **kwargs):
+        raise ConnectionError("connection dropped")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(AsyncIOMotorCollection, "insert_many", failing_insert_many)
+        with pytest.raises(ConnectionError):
+            await db_manager.flush_events()
+
+    await db_manager.flush_events()
+    events = await db_manager.get_analytics(guild_id)
+    assert sorted(e['user_id'] for e in events) == [1, 2]
+
+
+def test_read_cache_lru_and_ttl():
+    """Test cached documents expire, evict LRU-first and invalidate"""
+    db = DatabaseManager("mongodb://localhost:27017", "Logiq_test", cache_size=2)
+
+    db._cache_set(("guild", 1), {"guild_id": 1})
+    db._cache_set(("guild", 2), {"guild_id": 2})
+    assert db._cache_get(("guild", 1)) == {"guild_id": 1}
+
+    # Guild 2 is now least recently used
+    db._cache_set(("guild", 3), {"guild_id": 3})
+    assert db._cache_get(("guild", 2)) is None
+    assert db._cache_get(("guild", 1)) is not None
+
+    db._invalidate(("guild", 1))
+    assert db._cache_get(("guild", 1)) is None
+
+    # Expired entries read as a miss
+    db._cache[("guild", 4)] = (0.0, {"guild_id": 4})
+    assert db._cache_get(("guild", 4)) is None
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
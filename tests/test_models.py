@@ -0,0 +1,48 @@
+"""
+Unit tests for database models
+"""
+
+import pytest
+from dataclasses import fields
+from database.models import User, Guild, Warning, Ticket, ShopItem, Reminder
+
+
+SAMPLES = [
+    User(user_id=1, guild_id=2, last_message=3.0, last_daily=4.0),
+    Guild(guild_id=2),
+    Warning(moderator_id=1, reason="spam"),
+    Ticket(ticket_id="t1", guild_id=2, user_id=1, channel_id=3, category="support", closed_at=5.0),
+    ShopItem(item_id="i1", guild_id=2, name="VIP", description="VIP role", price=100, role_id=6),
+    Reminder(reminder_id="r1", user_id=1, guild_id=2, channel_id=3, message="hi", remind_at=7.0),
+]
+
+
+@pytest.mark.parametrize("model", SAMPLES, ids=lambda model: type(model).__name__)
+def test_to_dict_matches_fields(model):
+    """Test to_dict has every field, in declaration order, with its value"""
+    names = [f.name for f in fields(model)]
+    data = model.to_dict()
+
+    assert list(data) == names
+    assert data == {name: getattr(model, name) for name in names}
+
+
+def test_to_dict_omits_unset_optionals():
+    """Test omit_none drops only fields left at a None default"""
+    user = User(user_id=1, guild_id=2, last_daily=None, last_message=3.0).to_dict()
+    assert 'last_daily' not in user
+    assert user['last_message'] == 3.0
+    assert user['balance'] == 1000
+    assert 'inventory' not in user and 'warnings' not in user  # stored in their own collections
+
+    item = ShopItem(item_id="i1", guild_id=2, name="VIP", description="VIP role", price=100).to_dict()
+    assert 'role_id' not in item
+    assert item['stock'] == -1
+    assert item['purchasable'] is True
+
+
+def test_to_dict_keeps_none_without_omit_none():
+    """Test models without omit_none still write None fields"""
+    guild = Guild(guild_id=2).to_dict()
+    assert guild['log_channel'] is None
+    assert guild['welcome_channel'] is None
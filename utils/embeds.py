@@ -87,12 +87,13 @@ class EmbedFactory:
         )
 
     @staticmethod
-    def error(title: str, description: str) -> discord.Embed:
+    def error(title: str, description: str, timestamp: bool = True) -> discord.Embed:
         """Create error embed"""
         return EmbedFactory.create(
             title=f"❌ {title}",
             description=description,
-            color=EmbedColor.ERROR
+            color=EmbedColor.ERROR,
+            timestamp=timestamp
         )
 
     @staticmethod
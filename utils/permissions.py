@@ -10,34 +10,38 @@ from functools import wraps
 
 def is_admin():
     """Check if user has administrator permission"""
-    async def predicate(interaction: discord.Interaction) -> bool:
+    def predicate(interaction: discord.Interaction) -> bool:
         return interaction.user.guild_permissions.administrator
     return app_commands.check(predicate)
 
 
+# Any one of these grants moderator access
+MODERATOR_PERMISSIONS = discord.Permissions(
+    administrator=True,
+    kick_members=True,
+    ban_members=True,
+    manage_messages=True
+).value
+
+
 def is_moderator():
     """Check if user has moderation permissions"""
-    async def predicate(interaction: discord.Interaction) -> bool:
-        perms = interaction.user.guild_permissions
-        return any([
-            perms.administrator,
-            perms.kick_members,
-            perms.ban_members,
-            perms.manage_messages
-        ])
+    def predicate(interaction: discord.Interaction) -> bool:
+        return bool(interaction.user.guild_permissions.value & MODERATOR_PERMISSIONS)
     return app_commands.check(predicate)
 
 
 def has_role(role_id: int):
     """Check if user has specific role"""
-    async def predicate(interaction: discord.Interaction) -> bool:
-        return any(role.id == role_id for role in interaction.user.roles)
+    def predicate(interaction: discord.Interaction) -> bool:
+        # Member.roles builds and sorts a Role list per access; get_role searches the ID list
+        return interaction.user.get_role(role_id) is not None
     return app_commands.check(predicate)
 
 
 def bot_has_permissions(**perms):
     """Check if bot has required permissions"""
-    async def predicate(interaction: discord.Interaction) -> bool:
+    def predicate(interaction: discord.Interaction) -> bool:
         bot_perms = interaction.guild.me.guild_permissions
         return all(getattr(bot_perms, perm, False) for perm in perms)
     return app_commands.check(predicate)
@@ -45,7 +49,7 @@ def bot_has_permissions(**perms):
 
 def is_guild_owner():
     """Check if user is guild owner"""
-    async def predicate(interaction: discord.Interaction) -> bool:
+    def predicate(interaction: discord.Interaction) -> bool:
         return interaction.user.id == interaction.guild.owner_id
     return app_commands.check(predicate)
 
@@ -8,8 +8,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
+import time
 import os
 
 logger = logging.getLogger(__name__)
@@ -69,9 +70,9 @@ def create_app(bot) -> FastAPI:
         """Get bot statistics"""
         return {
             "guilds": len(bot.guilds),
-            "users": sum(g.member_count for g in bot.guilds),
+            "users": bot.total_member_count(),
             "channels": sum(len(g.channels) for g in bot.guilds),
-            "uptime": str(datetime.utcnow() - bot.start_time).split('.')[0] if hasattr(bot, 'start_time') else "Unknown",
+            "uptime": str(datetime.now(timezone.utc) - bot.start_time).split('.')[0],
             "latency": round(bot.latency * 1000)
         }
 
@@ -138,44 +139,27 @@ def create_app(bot) -> FastAPI:
         if not guild:
             raise HTTPException(status_code=404, detail="Guild not found")
 
-        end_time = datetime.utcnow().timestamp()
-        start_time = (datetime.utcnow() - timedelta(days=days)).timestamp()
-
-        # Get analytics data
-        messages = await bot.db.get_analytics(
-            guild_id,
-            event_type='message',
-            start_time=start_time,
-            end_time=end_time
-        )
-
-        joins = await bot.db.get_analytics(
-            guild_id,
-            event_type='member_join',
-            start_time=start_time,
-            end_time=end_time
-        )
-
-        leaves = await bot.db.get_analytics(
-            guild_id,
-            event_type='member_leave',
-            start_time=start_time,
-            end_time=end_time
-        )
+        end_time = time.time()
+        start_time = end_time - timedelta(days=days).total_seconds()
+
+        # Get analytics data (aggregated server-side)
+        counts = await bot.db.analytics_counts(guild_id, start_time, end_time)
+        joins = counts.get('member_join', 0)
+        leaves = counts.get('member_leave', 0)
 
         return {
             "guild_id": guild_id,
             "period_days": days,
-            "total_messages": len(messages),
-            "member_joins": len(joins),
-            "member_leaves": len(leaves),
-            "net_growth": len(joins) - len(leaves)
+            "total_messages": counts.get('message', 0),
+            "member_joins": joins,
+            "member_leaves": leaves,
+            "net_growth": joins - leaves
         }
 
     @app.get("/health")
     async def health_check():
         """Health check endpoint"""
-        db_connected = bot.db.is_connected if hasattr(bot.db, 'is_connected') else False
+        db_connected = bot.db.is_connected
 
         return {
             "status": "healthy" if bot.is_ready() and db_connected else "unhealthy",